@@ -1,8 +1,17 @@
-import requests
+import time
+import asyncio
+import aiohttp
 import logging
 from datetime import datetime, timedelta
-from config import ODDS_API_KEY, ODDS_API_BASE_URL, SPORTS_LIST
+from config import (
+    ODDS_API_KEY, ODDS_API_BASE_URL, SPORTS_LIST, ODDS_API_TIMEOUT,
+    ODDS_API_MAX_CONNECTIONS, ODDS_API_MAX_CONNECTIONS_PER_HOST, ODDS_API_KEEPALIVE_TIMEOUT
+)
 from pytz import timezone
+from odds_budget import request_budget
+from odds_decode import loads, iter_array
+from odds_breaker import CircuitBreaker, CircuitOpenError
+from odds_provider import OddsProvider
 
 logger = logging.getLogger(__name__)
 
@@ -10,37 +19,109 @@ logger = logging.getLogger(__name__)
 USA_TZ = timezone('America/New_York')
 
 
+def parse_commence_time(value):
+    """
+    Parse an Odds API ISO-8601 commence_time into an aware datetime
+    """
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def parse_sports_list(data):
+    """
+    Keep only the active USA sports from a raw /sports payload
+    """
+    sports = []
+    
+    # Filter only active USA sports
+    usa_sports_keys = [s for s in SPORTS_LIST if "american" in s or "nba" in s or "mlb" in s or "nhl" in s or "mls" in s]
+    
+    for sport in data:
+        # The API reports "active"; older payloads carried "inactive" instead
+        active = sport.get("active", not sport.get("inactive", False))
+        if active and sport["key"] in usa_sports_keys:
+            sports.append({
+                "key": sport["key"],
+                "name": sport["title"],
+                "group": sport["group"],
+                "active": active
+            })
+            logger.debug(f"Added sport: {sport['title']}")
+    
+    logger.info(f"✅ Found {len(sports)} USA sports")
+    return sports
+
+
 class OddsAPIHandler:
+    """
+    Request parameters and response parsers of the Odds API client
+    """
+
     def __init__(self):
         self.api_key = ODDS_API_KEY
         self.base_url = ODDS_API_BASE_URL
 
-    def get_live_matches(self, sport="americanfootball_nfl"):
+    def _odds_params(self, **extra):
         """
-        Fetch LIVE matches from The Odds API (USA sports)
+        Build the query parameters shared by every /odds request
         """
-        try:
-            url = f"{self.base_url}/sports/{sport}/odds"
-            params = {
-                "apiKey": self.api_key,
-                "regions": "us",  # USA regions
-                "markets": "h2h,spreads,totals",  # American odds markets
-                "oddsFormat": "american"  # American odds format
-            }
-            
-            logger.info(f"Fetching live matches for {sport}...")
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            matches = []
-            
-            if not data:
-                logger.warning(f"No live matches found for {sport}")
-                return []
-            
-            for event in data[:8]:  # Limit to 8 matches
-                try:
+        params = {
+            "apiKey": self.api_key,
+            "regions": "us",  # USA regions
+            "markets": "h2h,spreads,totals",  # American odds markets
+            "oddsFormat": "american"  # American odds format
+        }
+        params.update(extra)
+        return params
+
+    def _parse_live_matches(self, data, sport):
+        """
+        Turn a raw /odds payload into the live match list used by the bot
+        """
+        matches = []
+        
+        if not data:
+            logger.warning(f"No live matches found for {sport}")
+            return []
+        
+        for event in data[:8]:  # Limit to 8 matches
+            try:
+                match = {
+                    "match_id": event["id"],
+                    "sport": sport,
+                    "home_team": event["home_team"],
+                    "away_team": event["away_team"],
+                    "commence_time": event["commence_time"],
+                    "bookmakers": event.get("bookmakers", []),
+                    "status": "live"
+                }
+                matches.append(match)
+                logger.debug(f"Added match: {match['home_team']} vs {match['away_team']}")
+            except KeyError as e:
+                logger.error(f"Missing field in match data: {e}")
+                continue
+        
+        logger.info(f"✅ Fetched {len(matches)} live matches")
+        return matches
+
+    def _parse_upcoming_matches(self, data, sport, days):
+        """
+        Turn a raw /odds payload into the upcoming match list for the next N days
+        """
+        matches = []
+        
+        now = datetime.now(USA_TZ)
+        cutoff_date = now + timedelta(days=days)
+        
+        if not data:
+            logger.warning(f"No upcoming matches found for {sport}")
+            return []
+        
+        for event in data[:8]:  # Limit to 8 matches
+            try:
+                commence_time = parse_commence_time(event["commence_time"]).astimezone(USA_TZ)
+                
+                # Filter by date range
+                if commence_time <= cutoff_date:
                     match = {
                         "match_id": event["id"],
                         "sport": sport,
@@ -48,255 +129,247 @@ class OddsAPIHandler:
                         "away_team": event["away_team"],
                         "commence_time": event["commence_time"],
                         "bookmakers": event.get("bookmakers", []),
-                        "status": "live"
+                        "status": "upcoming"
                     }
                     matches.append(match)
-                    logger.debug(f"Added match: {match['home_team']} vs {match['away_team']}")
-                except KeyError as e:
-                    logger.error(f"Missing field in match data: {e}")
-                    continue
-            
-            logger.info(f"✅ Fetched {len(matches)} live matches")
-            return matches
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"❌ Error fetching live matches: {e}")
+                    logger.debug(f"Added upcoming match: {match['home_team']} vs {match['away_team']}")
+            except (KeyError, ValueError) as e:
+                logger.error(f"Error processing match: {e}")
+                continue
+        
+        logger.info(f"✅ Fetched {len(matches)} upcoming matches")
+        return matches
+
+    def _parse_match_odds(self, data, match_id):
+        """
+        Flatten the bookmakers of a single event into moneyline, spread and total lists
+        """
+        if not data:
+            logger.warning(f"No odds data found for match {match_id}")
+            return None
+        
+        event = data[0]
+        odds_data = {
+            "match_id": match_id,
+            "home_team": event["home_team"],
+            "away_team": event["away_team"],
+            "commence_time": event["commence_time"],
+            "odds": [],
+            "spreads": [],
+            "totals": []
+        }
+        
+        # Extract odds from bookmakers
+        for bookmaker in event.get("bookmakers", []):
+            for market in bookmaker.get("markets", []):
+                if market["key"] == "h2h":
+                    for outcome in market.get("outcomes", []):
+                        odds_data["odds"].append({
+                            "team": outcome["name"],
+                            "odds": outcome["price"],
+                            "bookmaker": bookmaker.get("title", "Unknown")
+                        })
+                elif market["key"] == "spreads":
+                    for outcome in market.get("outcomes", []):
+                        odds_data["spreads"].append({
+                            "team": outcome["name"],
+                            "spread": outcome.get("point", 0),
+                            "odds": outcome["price"]
+                        })
+                elif market["key"] == "totals":
+                    for outcome in market.get("outcomes", []):
+                        odds_data["totals"].append({
+                            "type": outcome["name"],
+                            "point": outcome.get("point", 0),
+                            "odds": outcome["price"]
+                        })
+        
+        logger.info(f"✅ Fetched odds for {odds_data['home_team']} vs {odds_data['away_team']}")
+        return odds_data
+
+
+class AsyncOddsAPIHandler(OddsAPIHandler, OddsProvider):
+    """
+    Non-blocking Odds API client for the async bot handlers, and the HTTP
+    OddsProvider.
+    
+    All requests share one aiohttp session, so connections to the Odds API are
+    kept alive and reused, capped per host, and cancelled once ODDS_API_TIMEOUT
+    expires instead of holding up the polling loop. A circuit breaker stops
+    requests while the provider keeps failing or timing out, so callers fall
+    back to what they have cached instead of waiting on the network.
+    """
+    name = "The Odds API"
+
+    def __init__(self):
+        super().__init__()
+        self._session = None
+        self.breaker = CircuitBreaker("Odds API")
+
+    @property
+    def is_available(self):
+        return not self.breaker.is_open
+
+    def health(self):
+        status = self.breaker.status()
+        if status['state'] == CircuitBreaker.CLOSED:
+            return None
+        return f"circuit {status['state'].replace('_', '-')} - next probe in {status['retry_in']:.0f}s"
+
+    def _get_session(self):
+        """
+        Lazily create the shared session (it must be built inside the running loop)
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=ODDS_API_MAX_CONNECTIONS,
+                limit_per_host=ODDS_API_MAX_CONNECTIONS_PER_HOST,
+                keepalive_timeout=ODDS_API_KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=ODDS_API_TIMEOUT)
+            )
+        return self._session
+
+    async def _get_raw(self, path, params):
+        """
+        GET the undecoded body of an Odds API response over the pooled session.
+        
+        Raises CircuitOpenError without a request while the breaker is open.
+        Network errors, timeouts, 5xx and 429 responses count against the
+        provider; other 4xx responses are our own mistakes and do not.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Odds API circuit open, next probe in {self.breaker.retry_in():.0f}s")
+        
+        session = self._get_session()
+        started = time.monotonic()
+        failed = True
+        try:
+            async with session.get(f"{self.base_url}{path}", params=params) as response:
+                request_budget.record(response.headers)
+                if response.status >= 400:
+                    failed = response.status >= 500 or response.status == 429
+                    response.raise_for_status()
+                body = await response.read()
+                failed = False
+                return body
+        finally:
+            self.breaker.record(time.monotonic() - started, failed)
+
+    async def _get_json(self, path, params):
+        """
+        GET a JSON document from the Odds API over the pooled session
+        """
+        return loads(await self._get_raw(path, params))
+
+    async def close(self):
+        """
+        Close the pooled session and release its connections
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def fetch_sports(self):
+        """
+        Fetch the raw /sports list (no quota cost); errors are left to the caller
+        """
+        return await self._get_json("/sports", {"apiKey": self.api_key})
+
+    async def fetch_odds(self, sport, markets="h2h,spreads,totals", regions="us", event_ids=None, limit=None):
+        """
+        Fetch the /odds feed of a sport as an iterator of raw events, decoded as
+        they are consumed (at most limit of them); errors are left to the caller
+        """
+        logger.info(f"Fetching {markets} odds feed for {sport} ({regions})...")
+        params = self._odds_params(markets=markets, regions=regions)
+        if event_ids:
+            params["eventIds"] = event_ids
+        raw = await self._get_raw(f"/sports/{sport}/odds", params)
+        return iter_array(raw, limit)
+
+    async def fetch_events(self, sport):
+        """
+        Fetch the odds-free /events listing of a sport (no quota cost) as an
+        iterator of raw events; errors are left to the caller
+        """
+        logger.info(f"Fetching event list for {sport}...")
+        raw = await self._get_raw(f"/sports/{sport}/events", {"apiKey": self.api_key, "dateFormat": "iso"})
+        return iter_array(raw)
+
+    async def fetch_scores(self, sport, days_from=None):
+        """
+        Fetch the /scores of a sport as an iterator of raw entries (costs 2 requests
+        with days_from, 1 without); errors are left to the caller
+        """
+        params = {"apiKey": self.api_key, "dateFormat": "iso"}
+        if days_from:
+            params["daysFrom"] = days_from
+        raw = await self._get_raw(f"/sports/{sport}/scores", params)
+        return iter_array(raw)
+
+    async def get_live_matches(self, sport="americanfootball_nfl"):
+        """
+        Fetch LIVE matches from The Odds API (USA sports)
+        """
+        try:
+            logger.info(f"Fetching live matches for {sport}...")
+            raw = await self._get_raw(f"/sports/{sport}/odds", self._odds_params())
+            return self._parse_live_matches(list(iter_array(raw, limit=8)), sport)
+        except (aiohttp.ClientError, asyncio.TimeoutError, CircuitOpenError) as e:
+            logger.error(f"❌ Error fetching live matches: {e!r}")
             return []
         except Exception as e:
             logger.error(f"❌ Unexpected error in get_live_matches: {e}")
             return []
 
-    def get_upcoming_matches(self, sport="americanfootball_nfl", days=7):
+    async def get_upcoming_matches(self, sport="americanfootball_nfl", days=7):
         """
         Fetch UPCOMING matches for the next N days
         """
         try:
-            url = f"{self.base_url}/sports/{sport}/odds"
-            params = {
-                "apiKey": self.api_key,
-                "regions": "us",  # USA regions
-                "markets": "h2h,spreads,totals",
-                "oddsFormat": "american",
-                "dateFormat": "iso"
-            }
-            
             logger.info(f"Fetching upcoming matches for {sport} (next {days} days)...")
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            matches = []
-            
-            now = datetime.now(USA_TZ)
-            cutoff_date = now + timedelta(days=days)
-            
-            if not data:
-                logger.warning(f"No upcoming matches found for {sport}")
-                return []
-            
-            for event in data[:8]:  # Limit to 8 matches
-                try:
-                    commence_time = datetime.fromisoformat(
-                        event["commence_time"].replace("Z", "+00:00")
-                    ).astimezone(USA_TZ)
-                    
-                    # Filter by date range
-                    if commence_time <= cutoff_date:
-                        match = {
-                            "match_id": event["id"],
-                            "sport": sport,
-                            "home_team": event["home_team"],
-                            "away_team": event["away_team"],
-                            "commence_time": event["commence_time"],
-                            "bookmakers": event.get("bookmakers", []),
-                            "status": "upcoming"
-                        }
-                        matches.append(match)
-                        logger.debug(f"Added upcoming match: {match['home_team']} vs {match['away_team']}")
-                except (KeyError, ValueError) as e:
-                    logger.error(f"Error processing match: {e}")
-                    continue
-            
-            logger.info(f"✅ Fetched {len(matches)} upcoming matches")
-            return matches
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"❌ Error fetching upcoming matches: {e}")
+            raw = await self._get_raw(f"/sports/{sport}/odds", self._odds_params(dateFormat="iso"))
+            return self._parse_upcoming_matches(list(iter_array(raw, limit=8)), sport, days)
+        except (aiohttp.ClientError, asyncio.TimeoutError, CircuitOpenError) as e:
+            logger.error(f"❌ Error fetching upcoming matches: {e!r}")
             return []
         except Exception as e:
             logger.error(f"❌ Unexpected error in get_upcoming_matches: {e}")
             return []
 
-    def get_match_odds(self, match_id, sport="americanfootball_nfl"):
+    async def get_match_odds(self, match_id, sport="americanfootball_nfl"):
         """
         Get detailed odds for a specific match
         """
         try:
-            url = f"{self.base_url}/sports/{sport}/odds"
-            params = {
-                "apiKey": self.api_key,
-                "regions": "us",
-                "markets": "h2h,spreads,totals",
-                "oddsFormat": "american",
-                "eventIds": match_id
-            }
-            
             logger.info(f"Fetching odds for match {match_id}...")
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if not data:
-                logger.warning(f"No odds data found for match {match_id}")
-                return None
-            
-            event = data[0]
-            odds_data = {
-                "match_id": match_id,
-                "home_team": event["home_team"],
-                "away_team": event["away_team"],
-                "commence_time": event["commence_time"],
-                "odds": [],
-                "spreads": [],
-                "totals": []
-            }
-            
-            # Extract odds from bookmakers
-            for bookmaker in event.get("bookmakers", []):
-                for market in bookmaker.get("markets", []):
-                    if market["key"] == "h2h":
-                        for outcome in market.get("outcomes", []):
-                            odds_data["odds"].append({
-                                "team": outcome["name"],
-                                "odds": outcome["price"],
-                                "bookmaker": bookmaker.get("title", "Unknown")
-                            })
-                    elif market["key"] == "spreads":
-                        for outcome in market.get("outcomes", []):
-                            odds_data["spreads"].append({
-                                "team": outcome["name"],
-                                "spread": outcome.get("point", 0),
-                                "odds": outcome["price"]
-                            })
-                    elif market["key"] == "totals":
-                        for outcome in market.get("outcomes", []):
-                            odds_data["totals"].append({
-                                "type": outcome["name"],
-                                "point": outcome.get("point", 0),
-                                "odds": outcome["price"]
-                            })
-            
-            logger.info(f"✅ Fetched odds for {odds_data['home_team']} vs {odds_data['away_team']}")
-            return odds_data
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"❌ Error fetching match odds: {e}")
+            raw = await self._get_raw(f"/sports/{sport}/odds", self._odds_params(eventIds=match_id))
+            return self._parse_match_odds(list(iter_array(raw, limit=1)), match_id)
+        except (aiohttp.ClientError, asyncio.TimeoutError, CircuitOpenError) as e:
+            logger.error(f"❌ Error fetching match odds: {e!r}")
             return None
         except Exception as e:
             logger.error(f"❌ Unexpected error in get_match_odds: {e}")
             return None
 
-    def get_sports_list(self):
+    async def get_sports_list(self):
         """
         Get list of available USA sports
         """
         try:
-            url = f"{self.base_url}/sports"
-            params = {"apiKey": self.api_key}
-            
             logger.info("Fetching available sports...")
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            sports = []
-            
-            # Filter only active USA sports
-            usa_sports_keys = [s for s in SPORTS_LIST if "american" in s or "nba" in s or "mlb" in s or "nhl" in s or "mls" in s]
-            
-            for sport in data:
-                if not sport["inactive"] and sport["key"] in usa_sports_keys:
-                    sports.append({
-                        "key": sport["key"],
-                        "name": sport["title"],
-                        "group": sport["group"],
-                        "active": not sport["inactive"]
-                    })
-                    logger.debug(f"Added sport: {sport['title']}")
-            
-            logger.info(f"✅ Found {len(sports)} USA sports")
-            return sports
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"❌ Error fetching sports list: {e}")
+            return parse_sports_list(await self.fetch_sports())
+        except (aiohttp.ClientError, asyncio.TimeoutError, CircuitOpenError) as e:
+            logger.error(f"❌ Error fetching sports list: {e!r}")
             return []
         except Exception as e:
             logger.error(f"❌ Unexpected error in get_sports_list: {e}")
             return []
 
-    def format_match_display(self, match):
-        """
-        Format match data for display in Telegram
-        """
-        try:
-            commence = datetime.fromisoformat(match["commence_time"].replace("Z", "+00:00"))
-            commence_str = commence.astimezone(USA_TZ).strftime("%m/%d %H:%M ET")
-        except:
-            commence_str = match["commence_time"]
-        
-        display = f"""
-🏆 <b>{match['home_team']} vs {match['away_team']}</b>
-⏰ {commence_str}
-"""
-        
-        # Add odds summary
-        if match.get("bookmakers"):
-            bookmaker = match["bookmakers"][0]
-            for market in bookmaker.get("markets", []):
-                if market["key"] == "h2h":
-                    display += "\n📊 <b>Odds:</b>\n"
-                    for outcome in market.get("outcomes", []):
-                        odds = outcome['price']
-                        display += f"  • {outcome['name']}: <b>{odds:+.0f}</b>\n"
-        
-        return display
-
-    def format_odds_display(self, odds_data):
-        """
-        Format odds data for display in Telegram
-        """
-        if not odds_data:
-            return "❌ Odds data not available"
-        
-        try:
-            commence = datetime.fromisoformat(odds_data["commence_time"].replace("Z", "+00:00"))
-            commence_str = commence.astimezone(USA_TZ).strftime("%m/%d %H:%M ET")
-        except:
-            commence_str = odds_data["commence_time"]
-        
-        display = f"""
-⚽ <b>{odds_data['home_team']} vs {odds_data['away_team']}</b>
-⏰ {commence_str}
-
-📊 <b>Moneyline Odds:</b>
-"""
-        
-        for odd in odds_data.get("odds", []):
-            display += f"  • {odd['team']}: <b>{odd['odds']:+.0f}</b>\n"
-        
-        if odds_data.get("spreads"):
-            display += "\n📈 <b>Point Spread:</b>\n"
-            for spread in odds_data.get("spreads", []):
-                display += f"  • {spread['team']} {spread['spread']:+.1f}: <b>{spread['odds']:+.0f}</b>\n"
-        
-        if odds_data.get("totals"):
-            display += "\n🎯 <b>Over/Under:</b>\n"
-            for total in odds_data.get("totals", []):
-                display += f"  • {total['type']} {total['point']}: <b>{total['odds']:+.0f}</b>\n"
-        
-        return display
-
 
 # Initialize API handler
-odds_api = OddsAPIHandler()
+async_odds_api = AsyncOddsAPIHandler()
@@ -0,0 +1,46 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundWriter:
+    """
+    One background thread that runs blocking writes in the order they were submitted.
+    
+    Inside a running event loop a write is queued on the thread so the loop
+    never waits on disk; outside one (startup, scripts) it runs right away.
+    close() waits for queued writes before stopping the thread.
+    """
+
+    def __init__(self, name, description):
+        self.description = description  # what is written, for error logs
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        self._pending = set()
+
+    def submit(self, func, *args):
+        """
+        Run func(*args) on the writer thread, or right away outside an event loop
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            func(*args)
+            return
+        future = loop.run_in_executor(self._executor, func, *args)
+        self._pending.add(future)
+        future.add_done_callback(self._write_done)
+
+    def _write_done(self, future):
+        self._pending.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"❌ Could not write {self.description}: {future.exception()}")
+
+    async def close(self):
+        """
+        Wait for queued writes and stop the writer thread
+        """
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        self._executor.shutdown(wait=True)
@@ -1,644 +1,945 @@
 import sqlite3
 import os
+import time
+import queue
+import asyncio
 import logging
+import threading
+from functools import partial
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from config import SQLITE_DB_PATH, INITIAL_BALANCE, DATABASE_TYPE
+from config import (
+    SQLITE_DB_PATH, INITIAL_BALANCE, DATABASE_TYPE, DEFAULT_ODDS_TYPE, DB_READER_CONNECTIONS, DB_BUSY_TIMEOUT,
+    DB_CACHE_SIZE_KB, DB_MMAP_SIZE, DB_HEALTH_CHECK_INTERVAL
+)
+from odds_format import potential_win, odds_type_or_default
 
 logger = logging.getLogger(__name__)
 
-
-class Database:
-    def __init__(self):
-        self.db_path = SQLITE_DB_PATH
-        self.init_db()
-
-    def get_connection(self):
-        """Get a database connection"""
+# Versioned schema steps applied in order by Database.migrate; never edit a released step, add a new one
+SCHEMA_STEPS = [
+    (1, [
+        # my_bets: one user's bets, newest first (optionally by status)
+        "CREATE INDEX IF NOT EXISTS idx_bets_user_created ON bets (user_id, created_at)",
+        # Settlement: the open bets of one match, grouped by user
+        "CREATE INDEX IF NOT EXISTS idx_bets_match_status_user ON bets (match_id, status, user_id)",
+        # Admin pending screens, newest first
+        "CREATE INDEX IF NOT EXISTS idx_transactions_status_created ON transactions (status, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_transactions_status_type_created ON transactions (status, type, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_deposits_status_created ON deposits (status, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_withdrawals_status_created ON withdrawals (status, created_at)",
+    ]),
+]
+
+
+class ConnectionPool:
+    """
+    Long-lived SQLite connections: one writer and up to `readers` readers.
+    
+    The database runs in WAL mode, so readers never block the writer or each
+    other, and every write goes through the single writer connection, one
+    transaction at a time, so writers never fight over the lock. Connections
+    are opened once with tuned pragmas and reused; one that has been idle
+    longer than health_check_interval is pinged before use and reopened if
+    it no longer answers.
+    """
+
+    def __init__(self, path, readers=DB_READER_CONNECTIONS, health_check_interval=DB_HEALTH_CHECK_INTERVAL):
+        self.path = path
+        self.max_readers = readers
+        self.health_check_interval = health_check_interval
+        self._write_lock = threading.Lock()
+        self._writer = None
+        self._readers = queue.LifoQueue()
+        self._readers_lock = threading.Lock()
+        self._reader_count = 0
+        self._closed = False
+        self._last_used = {}  # id(conn) -> time.monotonic() it was last handed back
+        self.reconnects = 0
+        
+        db_dir = os.path.dirname(self.path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+
+    def _connect(self):
+        """
+        Open a connection with the pool's pragmas
+        """
         try:
-            # Ensure the directory exists
-            db_dir = os.path.dirname(self.db_path)
-            if db_dir and not os.path.exists(db_dir):
-                os.makedirs(db_dir, exist_ok=True)
-            
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            return conn
+            conn = sqlite3.connect(self.path, timeout=DB_BUSY_TIMEOUT, check_same_thread=False)
         except sqlite3.OperationalError as e:
             logger.error(f"Database connection error: {e}")
-            logger.error(f"Database path: {self.db_path}")
+            logger.error(f"Database path: {self.path}")
             logger.error(f"Current working directory: {os.getcwd()}")
             raise
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA cache_size = -{DB_CACHE_SIZE_KB}")
+        conn.execute(f"PRAGMA mmap_size = {DB_MMAP_SIZE}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        self._last_used[id(conn)] = time.monotonic()
+        return conn
+
+    def _healthy(self, conn):
+        """
+        Ping a connection that has been idle for a while
+        """
+        if time.monotonic() - self._last_used.get(id(conn), 0) < self.health_check_interval:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Reopening unhealthy database connection: {e}")
+            self._discard(conn)
+            return False
+
+    def _discard(self, conn):
+        self._last_used.pop(id(conn), None)
+        self.reconnects += 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _check_open(self):
+        if self._closed:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed connection pool.")
+
+    def _checkout_reader(self):
+        """
+        An idle reader, a new one while under the limit, or the next one handed back
+        """
+        self._check_open()
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            with self._readers_lock:
+                self._check_open()
+                grow = self._reader_count < self.max_readers
+                if grow:
+                    self._reader_count += 1
+            if not grow:
+                conn = self._readers.get()
+            else:
+                try:
+                    return self._connect()
+                except sqlite3.Error:
+                    with self._readers_lock:
+                        self._reader_count -= 1
+                    raise
+        if self._healthy(conn):
+            return conn
+        try:
+            return self._connect()
+        except sqlite3.Error:
+            with self._readers_lock:
+                self._reader_count -= 1
+            raise
+
+    @contextmanager
+    def read(self):
+        """
+        Borrow a reader connection; blocks while all readers are busy
+        """
+        conn = self._checkout_reader()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._last_used[id(conn)] = time.monotonic()
+            self._readers.put(conn)
+
+    @contextmanager
+    def write(self):
+        """
+        Hold the writer connection for one transaction: committed when the block
+        exits, rolled back if it raises
+        """
+        with self._write_lock:
+            self._check_open()
+            if self._writer is None or not self._healthy(self._writer):
+                self._writer = self._connect()
+            conn = self._writer
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                self._last_used[id(conn)] = time.monotonic()
+
+    def status(self):
+        """
+        Pool state for the admin statistics screens
+        """
+        with self.read() as conn:
+            journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        return {
+            "journal_mode": journal_mode,
+            "readers": self._reader_count,
+            "idle_readers": self._readers.qsize(),
+            "reconnects": self.reconnects,
+        }
+
+    def close(self):
+        """
+        Refuse new checkouts, then close every pooled connection once the
+        running write and every borrowed reader have been handed back
+        """
+        with self._readers_lock:
+            self._closed = True
+            outstanding = self._reader_count
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        for _ in range(outstanding):
+            try:
+                conn = self._readers.get(timeout=DB_BUSY_TIMEOUT)
+            except queue.Empty:
+                logger.warning(f"⚠️ Closed the database with {self._reader_count} readers still checked out")
+                break
+            conn.close()
+            with self._readers_lock:
+                self._reader_count -= 1
+        self._last_used.clear()
+
+
+class Database:
+    def __init__(self):
+        self.db_path = SQLITE_DB_PATH
+        self.pool = ConnectionPool(self.db_path)
+        self.init_db()
 
     def init_db(self):
         """Initialize the database with required tables"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        # Create users table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                user_id INTEGER PRIMARY KEY,
-                username TEXT UNIQUE,
-                first_name TEXT,
-                last_name TEXT,
-                balance REAL DEFAULT 0,
-                total_bet INTEGER DEFAULT 0,
-                total_win INTEGER DEFAULT 0,
-                total_loss INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                is_verified BOOLEAN DEFAULT 0
-            )
-        """)
-
-        # Create bets table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS bets (
-                bet_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                match_id TEXT NOT NULL,
-                team_name TEXT NOT NULL,
-                odds REAL NOT NULL,
-                amount REAL NOT NULL,
-                potential_win REAL,
-                status TEXT DEFAULT 'pending',
-                result TEXT DEFAULT 'waiting',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                resolved_at TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(user_id)
-            )
-        """)
-
-        # Create matches table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS matches (
-                match_id TEXT PRIMARY KEY,
-                sport TEXT,
-                home_team TEXT,
-                away_team TEXT,
-                commence_time TIMESTAMP,
-                status TEXT DEFAULT 'pending',
-                result TEXT,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-
-        # Create transactions table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS transactions (
-                tx_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                type TEXT NOT NULL,
-                amount REAL NOT NULL,
-                status TEXT DEFAULT 'pending',
-                admin_approved_by INTEGER,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                approved_at TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(user_id)
-            )
-        """)
-
-        # Create audit log table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS audit_log (
-                log_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                admin_id INTEGER,
-                action TEXT,
-                details TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-
-        # Create wallet addresses table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS wallet_addresses (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                crypto_type TEXT UNIQUE NOT NULL,
-                wallet_address TEXT NOT NULL,
-                updated_by INTEGER,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (updated_by) REFERENCES users(user_id)
-            )
-        """)
-
-        # Create deposits table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS deposits (
-                tx_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                amount REAL NOT NULL,
-                method TEXT DEFAULT 'BTC',
-                status TEXT DEFAULT 'pending',
-                transaction_id TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                processed_at TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(user_id)
-            )
-        """)
-
-        # Create withdrawals table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS withdrawals (
-                tx_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                amount REAL NOT NULL,
-                method TEXT NOT NULL,
-                wallet_address TEXT NOT NULL,
-                status TEXT DEFAULT 'pending',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                processed_at TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(user_id)
-            )
-        """)
-
-        # Create admin_logs table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS admin_logs (
-                log_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                action TEXT NOT NULL,
-                details TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(user_id)
-            )
-        """)
-
-        conn.commit()
-        conn.close()
+        with self.pool.write() as conn:
+            cursor = conn.cursor()
+
+            # Create users table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS users (
+                    user_id INTEGER PRIMARY KEY,
+                    username TEXT UNIQUE,
+                    first_name TEXT,
+                    last_name TEXT,
+                    balance REAL DEFAULT 0,
+                    total_bet INTEGER DEFAULT 0,
+                    total_win INTEGER DEFAULT 0,
+                    total_loss INTEGER DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    is_verified BOOLEAN DEFAULT 0
+                )
+            """)
+
+            # Create bets table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS bets (
+                    bet_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL,
+                    match_id TEXT NOT NULL,
+                    team_name TEXT NOT NULL,
+                    odds REAL NOT NULL,
+                    amount REAL NOT NULL,
+                    potential_win REAL,
+                    status TEXT DEFAULT 'pending',
+                    result TEXT DEFAULT 'waiting',
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    resolved_at TIMESTAMP,
+                    FOREIGN KEY (user_id) REFERENCES users(user_id)
+                )
+            """)
+
+            # Create matches table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS matches (
+                    match_id TEXT PRIMARY KEY,
+                    sport TEXT,
+                    home_team TEXT,
+                    away_team TEXT,
+                    commence_time TIMESTAMP,
+                    status TEXT DEFAULT 'pending',
+                    result TEXT,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+            # Create transactions table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS transactions (
+                    tx_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL,
+                    type TEXT NOT NULL,
+                    amount REAL NOT NULL,
+                    status TEXT DEFAULT 'pending',
+                    admin_approved_by INTEGER,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    approved_at TIMESTAMP,
+                    FOREIGN KEY (user_id) REFERENCES users(user_id)
+                )
+            """)
+
+            # Create audit log table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS audit_log (
+                    log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    admin_id INTEGER,
+                    action TEXT,
+                    details TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+            # Create wallet addresses table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS wallet_addresses (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    crypto_type TEXT UNIQUE NOT NULL,
+                    wallet_address TEXT NOT NULL,
+                    updated_by INTEGER,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (updated_by) REFERENCES users(user_id)
+                )
+            """)
+
+            # Create deposits table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS deposits (
+                    tx_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL,
+                    amount REAL NOT NULL,
+                    method TEXT DEFAULT 'BTC',
+                    status TEXT DEFAULT 'pending',
+                    transaction_id TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    processed_at TIMESTAMP,
+                    FOREIGN KEY (user_id) REFERENCES users(user_id)
+                )
+            """)
+
+            # Create withdrawals table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS withdrawals (
+                    tx_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL,
+                    amount REAL NOT NULL,
+                    method TEXT NOT NULL,
+                    wallet_address TEXT NOT NULL,
+                    status TEXT DEFAULT 'pending',
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    processed_at TIMESTAMP,
+                    FOREIGN KEY (user_id) REFERENCES users(user_id)
+                )
+            """)
+
+            # Create admin_logs table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS admin_logs (
+                    log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL,
+                    action TEXT NOT NULL,
+                    details TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (user_id) REFERENCES users(user_id)
+                )
+            """)
+
+            # Create odds history table (append-only; price is NULL once a bookmaker pulls the line)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS odds_history (
+                    ts INTEGER NOT NULL,
+                    match_id TEXT NOT NULL,
+                    bookmaker TEXT NOT NULL,
+                    market TEXT NOT NULL,
+                    outcome TEXT NOT NULL,
+                    price REAL,
+                    point REAL
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_odds_history_match_ts ON odds_history (match_id, ts)
+            """)
+
+            # Preferred odds format, added to users after the first release
+            cursor.execute("PRAGMA table_info(users)")
+            if "odds_format" not in {row[1] for row in cursor.fetchall()}:
+                cursor.execute(
+                    f"ALTER TABLE users ADD COLUMN odds_format TEXT DEFAULT '{DEFAULT_ODDS_TYPE}'"
+                )
+
+            self.migrate(cursor)
+
+    def migrate(self, cursor):
+        """Apply the schema steps newer than the database's PRAGMA user_version"""
+        cursor.execute("PRAGMA user_version")
+        version = cursor.fetchone()[0]
+        for step_version, statements in SCHEMA_STEPS:
+            if step_version <= version:
+                continue
+            for statement in statements:
+                cursor.execute(statement)
+            # PRAGMA does not take parameters; the version is our own integer
+            cursor.execute(f"PRAGMA user_version = {int(step_version)}")
+            logger.info(f"Applied database schema step {step_version}")
 
     def add_user(self, user_id, username, first_name, last_name):
         """Add a new user"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                INSERT INTO users (user_id, username, first_name, last_name, balance)
-                VALUES (?, ?, ?, ?, ?)
-            """, (user_id, username, first_name, last_name, INITIAL_BALANCE))
-            conn.commit()
-            return True
-        except sqlite3.IntegrityError:
-            return False
-        finally:
-            conn.close()
+        with self.pool.write() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("""
+                    INSERT INTO users (user_id, username, first_name, last_name, balance)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (user_id, username, first_name, last_name, INITIAL_BALANCE))
+                return True
+            except sqlite3.IntegrityError:
+                return False
 
     def user_exists(self, user_id):
         """Check if user exists"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT 1 FROM users WHERE user_id = ?", (user_id,))
-        result = cursor.fetchone()
-        conn.close()
-        return result is not None
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1 FROM users WHERE user_id = ?", (user_id,))
+            result = cursor.fetchone()
+            return result is not None
 
     def get_user_balance(self, user_id):
         """Get user balance"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT balance FROM users WHERE user_id = ?", (user_id,))
-        result = cursor.fetchone()
-        conn.close()
-        return result[0] if result else 0
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT balance FROM users WHERE user_id = ?", (user_id,))
+            result = cursor.fetchone()
+            return result[0] if result else 0
+
+    def get_odds_format(self, user_id):
+        """Get the odds format a user prefers"""
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT odds_format FROM users WHERE user_id = ?", (user_id,))
+            result = cursor.fetchone()
+            return odds_type_or_default(result[0] if result else None)
+
+    def set_odds_format(self, user_id, odds_type):
+        """Set the odds format a user prefers"""
+        with self.pool.write() as conn:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE users SET odds_format = ? WHERE user_id = ?",
+                          (odds_type_or_default(odds_type), user_id))
+            return cursor.rowcount > 0
 
     def get_user_info(self, user_id):
         """Get user information"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM users WHERE user_id = ?", (user_id,))
-        result = cursor.fetchone()
-        conn.close()
-        return dict(result) if result else None
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM users WHERE user_id = ?", (user_id,))
+            result = cursor.fetchone()
+            return dict(result) if result else None
 
     def update_balance(self, user_id, amount):
         """Update user balance"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE users SET balance = balance + ? WHERE user_id = ?
-        """, (amount, user_id))
-        conn.commit()
-        conn.close()
+        with self.pool.write() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE users SET balance = balance + ? WHERE user_id = ?
+            """, (amount, user_id))
 
     def place_bet(self, user_id, match_id, team_name, odds, amount):
-        """Place a new bet"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        potential_win = amount * odds
-        cursor.execute("""
-            INSERT INTO bets (user_id, match_id, team_name, odds, amount, potential_win)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (user_id, match_id, team_name, odds, amount, potential_win))
-        conn.commit()
-        
-        # Update user balance (deduct bet amount)
-        cursor.execute("UPDATE users SET balance = balance - ?, total_bet = total_bet + 1 WHERE user_id = ?", 
-                      (amount, user_id))
-        conn.commit()
-        
-        bet_id = cursor.lastrowid
-        conn.close()
-        return bet_id
+        """Place a new bet in one transaction; returns (bet_id, new_balance), or None if the balance is too low"""
+        with self.pool.write() as conn:
+            cursor = conn.cursor()
+            
+            # Debit the stake only if the balance covers it (atomic under concurrent bets)
+            cursor.execute("""
+                UPDATE users SET balance = balance - ?, total_bet = total_bet + 1
+                WHERE user_id = ? AND balance >= ?
+                RETURNING balance
+            """, (amount, user_id, amount))
+            debited = cursor.fetchone()
+            if debited is None:
+                return None
+            
+            cursor.execute("""
+                INSERT INTO bets (user_id, match_id, team_name, odds, amount, potential_win)
+                VALUES (?, ?, ?, ?, ?, ?)
+                RETURNING bet_id
+            """, (user_id, match_id, team_name, odds, amount, potential_win(amount, odds)))
+            return cursor.fetchone()[0], debited[0]
 
     def get_user_bets(self, user_id, status=None):
         """Get user bets"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        if status:
-            cursor.execute("""
-                SELECT * FROM bets WHERE user_id = ? AND status = ? ORDER BY created_at DESC
-            """, (user_id, status))
-        else:
-            cursor.execute("""
-                SELECT * FROM bets WHERE user_id = ? ORDER BY created_at DESC
-            """, (user_id,))
-        results = cursor.fetchall()
-        conn.close()
-        return [dict(row) for row in results]
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
+            if status:
+                cursor.execute("""
+                    SELECT * FROM bets WHERE user_id = ? AND status = ? ORDER BY created_at DESC
+                """, (user_id, status))
+            else:
+                cursor.execute("""
+                    SELECT * FROM bets WHERE user_id = ? ORDER BY created_at DESC
+                """, (user_id,))
+            results = cursor.fetchall()
+            return [dict(row) for row in results]
 
     def settle_bet(self, bet_id, result, win_amount=0):
         """Settle a bet (won or lost)"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT user_id, amount FROM bets WHERE bet_id = ?", (bet_id,))
-        bet = cursor.fetchone()
-        
-        if not bet:
-            conn.close()
-            return False
-        
-        user_id, bet_amount = bet[0], bet[1]
-        
-        cursor.execute("""
-            UPDATE bets SET status = ?, result = ?, resolved_at = CURRENT_TIMESTAMP 
-            WHERE bet_id = ?
-        """, ('resolved', result, bet_id))
+        with self.pool.write() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("SELECT user_id, amount FROM bets WHERE bet_id = ?", (bet_id,))
+            bet = cursor.fetchone()
+            
+            if not bet:
+                return False
+            
+            user_id, bet_amount = bet[0], bet[1]
+            
+            cursor.execute("""
+                UPDATE bets SET status = ?, result = ?, resolved_at = CURRENT_TIMESTAMP 
+                WHERE bet_id = ?
+            """, ('resolved', result, bet_id))
+            
+            if result == 'won':
+                cursor.execute("""
+                    UPDATE users SET balance = balance + ?, total_win = total_win + 1 
+                    WHERE user_id = ?
+                """, (win_amount, user_id))
+            else:
+                cursor.execute("""
+                    UPDATE users SET total_loss = total_loss + 1 WHERE user_id = ?
+                """, (user_id,))
+            
+            return True
+
+    def settle_match(self, match_id, winner):
+        """
+        Settle every pending bet on a match in one transaction.
         
-        if result == 'won':
+        Bets on the winning team are paid their stake plus the profit at their
+        stored American odds, rounded per bet; the rest are lost. With winner
+        None the match is void and stakes are refunded.
+        Payouts are summed per user and applied in a single UPDATE. Returns
+        one summary per user: user_id, bets, won, lost, staked, payout, balance.
+        """
+        void = winner is None
+        params = {"match_id": match_id, "winner": winner, "void": int(void)}
+        # Winnings come from the stored odds: rows placed before potential_win
+        # became profit-only still hold the old value
+        per_user = """
+            SELECT user_id,
+                COUNT(*) AS bets,
+                SUM(NOT :void AND team_name = :winner) AS won,
+                SUM(NOT :void AND team_name != :winner) AS lost,
+                ROUND(SUM(amount), 2) AS staked,
+                ROUND(SUM(CASE
+                    WHEN :void THEN amount
+                    WHEN team_name = :winner THEN amount + ROUND(amount * CASE
+                        WHEN odds > 0 THEN odds / 100.0
+                        ELSE 100.0 / -odds
+                    END, 2)
+                    ELSE 0
+                END), 2) AS payout
+            FROM bets
+            WHERE match_id = :match_id AND status = 'pending'
+            GROUP BY user_id
+        """
+        with self.pool.write() as conn:
+            cursor = conn.cursor()
+            cursor.execute(per_user, params)
+            summaries = {row["user_id"]: dict(row) for row in cursor.fetchall()}
+            if not summaries:
+                return []
+            
+            cursor.execute(f"""
+                UPDATE users SET
+                    balance = balance + settled.payout,
+                    total_win = total_win + settled.won,
+                    total_loss = total_loss + settled.lost
+                FROM ({per_user}) AS settled
+                WHERE users.user_id = settled.user_id
+                RETURNING users.user_id, users.balance
+            """, params)
+            for user_id, balance in cursor.fetchall():
+                summaries[user_id]["balance"] = balance
+            
             cursor.execute("""
-                UPDATE users SET balance = balance + ?, total_win = total_win + 1 
-                WHERE user_id = ?
-            """, (win_amount, user_id))
-        else:
+                UPDATE bets SET
+                    status = 'resolved',
+                    result = CASE
+                        WHEN :void THEN 'void'
+                        WHEN team_name = :winner THEN 'won'
+                        ELSE 'lost'
+                    END,
+                    resolved_at = CURRENT_TIMESTAMP
+                WHERE match_id = :match_id AND status = 'pending'
+            """, params)
+            
             cursor.execute("""
-                UPDATE users SET total_loss = total_loss + 1 WHERE user_id = ?
-            """, (user_id,))
+                UPDATE matches SET status = 'completed', result = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE match_id = ?
+            """, (winner or 'void', match_id))
         
-        conn.commit()
-        conn.close()
-        return True
+        logger.info(f"Settled {sum(s['bets'] for s in summaries.values())} bets on match {match_id} for {len(summaries)} users")
+        return list(summaries.values())
 
     def request_deposit(self, user_id, amount):
         """Request a deposit"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO transactions (user_id, type, amount, status)
-            VALUES (?, ?, ?, 'pending')
-        """, (user_id, 'deposit', amount))
-        conn.commit()
-        tx_id = cursor.lastrowid
-        conn.close()
-        return tx_id
+        with self.pool.write() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO transactions (user_id, type, amount, status)
+                VALUES (?, ?, ?, 'pending')
+            """, (user_id, 'deposit', amount))
+            tx_id = cursor.lastrowid
+            return tx_id
 
     def request_withdraw(self, user_id, amount):
         """Request a withdrawal"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO transactions (user_id, type, amount, status)
-            VALUES (?, ?, ?, 'pending')
-        """, (user_id, 'withdraw', amount))
-        conn.commit()
-        tx_id = cursor.lastrowid
-        conn.close()
-        return tx_id
+        with self.pool.write() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO transactions (user_id, type, amount, status)
+                VALUES (?, ?, ?, 'pending')
+            """, (user_id, 'withdraw', amount))
+            tx_id = cursor.lastrowid
+            return tx_id
 
     def approve_transaction(self, tx_id, admin_id):
         """Approve a transaction"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT user_id, type, amount FROM transactions WHERE tx_id = ?
-        """, (tx_id,))
-        transaction = cursor.fetchone()
-        
-        if not transaction:
-            conn.close()
-            return False
-        
-        user_id, tx_type, amount = transaction
-        
-        cursor.execute("""
-            UPDATE transactions SET status = ?, admin_approved_by = ?, approved_at = CURRENT_TIMESTAMP
-            WHERE tx_id = ?
-        """, ('approved', admin_id, tx_id))
-        
-        if tx_type == 'deposit':
-            cursor.execute("UPDATE users SET balance = balance + ? WHERE user_id = ?", (amount, user_id))
-        else:  # withdraw
-            cursor.execute("UPDATE users SET balance = balance - ? WHERE user_id = ?", (amount, user_id))
-        
-        conn.commit()
-        conn.close()
-        return True
-
-    def reject_transaction(self, tx_id, admin_id):
-        """Reject a transaction without changing balance"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            # Ensure transaction exists
+        with self.pool.write() as conn:
+            cursor = conn.cursor()
+            
             cursor.execute("""
-                SELECT tx_id FROM transactions WHERE tx_id = ?
+                SELECT user_id, type, amount FROM transactions WHERE tx_id = ?
             """, (tx_id,))
-            row = cursor.fetchone()
-            if not row:
+            transaction = cursor.fetchone()
+            
+            if not transaction:
                 return False
-
-            cursor.execute(
-                """
-                UPDATE transactions
-                SET status = 'rejected', admin_approved_by = ?, approved_at = CURRENT_TIMESTAMP
+            
+            user_id, tx_type, amount = transaction
+            
+            cursor.execute("""
+                UPDATE transactions SET status = ?, admin_approved_by = ?, approved_at = CURRENT_TIMESTAMP
                 WHERE tx_id = ?
-                """,
-                (admin_id, tx_id),
-            )
-            conn.commit()
+            """, ('approved', admin_id, tx_id))
+            
+            if tx_type == 'deposit':
+                cursor.execute("UPDATE users SET balance = balance + ? WHERE user_id = ?", (amount, user_id))
+            else:  # withdraw
+                cursor.execute("UPDATE users SET balance = balance - ? WHERE user_id = ?", (amount, user_id))
+            
             return True
-        except Exception:
-            conn.rollback()
-            return False
-        finally:
-            conn.close()
+
+    def reject_transaction(self, tx_id, admin_id):
+        """Reject a transaction without changing balance"""
+        with self.pool.write() as conn:
+            cursor = conn.cursor()
+            try:
+                # Ensure transaction exists
+                cursor.execute("""
+                    SELECT tx_id FROM transactions WHERE tx_id = ?
+                """, (tx_id,))
+                row = cursor.fetchone()
+                if not row:
+                    return False
+
+                cursor.execute(
+                    """
+                    UPDATE transactions
+                    SET status = 'rejected', admin_approved_by = ?, approved_at = CURRENT_TIMESTAMP
+                    WHERE tx_id = ?
+                    """,
+                    (admin_id, tx_id),
+                )
+                return True
+            except Exception:
+                conn.rollback()
+                return False
 
     def get_pending_transactions(self):
         """Get all pending transactions"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT t.*, u.username FROM transactions t
-            JOIN users u ON t.user_id = u.user_id
-            WHERE t.status = 'pending'
-            ORDER BY t.created_at DESC
-        """)
-        results = cursor.fetchall()
-        conn.close()
-        return [dict(row) for row in results]
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT t.*, u.username FROM transactions t
+                JOIN users u ON t.user_id = u.user_id
+                WHERE t.status = 'pending'
+                ORDER BY t.created_at DESC
+            """)
+            results = cursor.fetchall()
+            return [dict(row) for row in results]
 
     def get_pending_deposits(self):
         """Get all pending deposits"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT t.*, u.username FROM transactions t
-            JOIN users u ON t.user_id = u.user_id
-            WHERE t.status = 'pending' AND t.type = 'deposit'
-            ORDER BY t.created_at DESC
-        """)
-        results = cursor.fetchall()
-        conn.close()
-        return [dict(row) for row in results]
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT t.*, u.username FROM transactions t
+                JOIN users u ON t.user_id = u.user_id
+                WHERE t.status = 'pending' AND t.type = 'deposit'
+                ORDER BY t.created_at DESC
+            """)
+            results = cursor.fetchall()
+            return [dict(row) for row in results]
 
     def get_pending_withdrawals(self):
         """Get all pending withdrawals"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT t.*, u.username FROM transactions t
-            JOIN users u ON t.user_id = u.user_id
-            WHERE t.status = 'pending' AND t.type = 'withdraw'
-            ORDER BY t.created_at DESC
-        """)
-        results = cursor.fetchall()
-        conn.close()
-        return [dict(row) for row in results]
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT t.*, u.username FROM transactions t
+                JOIN users u ON t.user_id = u.user_id
+                WHERE t.status = 'pending' AND t.type = 'withdraw'
+                ORDER BY t.created_at DESC
+            """)
+            results = cursor.fetchall()
+            return [dict(row) for row in results]
 
     def get_all_users(self):
         """Get all users"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM users ORDER BY created_at DESC")
-        results = cursor.fetchall()
-        conn.close()
-        return [dict(row) for row in results]
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM users ORDER BY created_at DESC")
+            results = cursor.fetchall()
+            return [dict(row) for row in results]
 
     def get_stats(self):
         """Get overall statistics"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT 
-                COUNT(DISTINCT user_id) as total_users,
-                SUM(total_bet) as total_bets,
-                SUM(total_win) as total_wins,
-                SUM(total_loss) as total_losses,
-                SUM(balance) as total_balance
-            FROM users
-        """)
-        result = cursor.fetchone()
-        conn.close()
-        return dict(result) if result else {}
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT 
+                    COUNT(DISTINCT user_id) as total_users,
+                    SUM(total_bet) as total_bets,
+                    SUM(total_win) as total_wins,
+                    SUM(total_loss) as total_losses,
+                    SUM(balance) as total_balance
+                FROM users
+            """)
+            result = cursor.fetchone()
+            return dict(result) if result else {}
 
     def log_action(self, admin_id, action, details):
         """Log admin action"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO audit_log (admin_id, action, details)
-            VALUES (?, ?, ?)
-        """, (admin_id, action, details))
-        conn.commit()
-        conn.close()
+        with self.pool.write() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO audit_log (admin_id, action, details)
+                VALUES (?, ?, ?)
+            """, (admin_id, action, details))
 
     def set_wallet_address(self, crypto_type, wallet_address, admin_id):
         """Set wallet address for a cryptocurrency"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                INSERT OR REPLACE INTO wallet_addresses (crypto_type, wallet_address, updated_by)
-                VALUES (?, ?, ?)
-            """, (crypto_type.upper(), wallet_address, admin_id))
-            conn.commit()
-            return True
-        except Exception as e:
-            logger.error(f"Error setting wallet address: {e}")
-            return False
-        finally:
-            conn.close()
+        with self.pool.write() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("""
+                    INSERT OR REPLACE INTO wallet_addresses (crypto_type, wallet_address, updated_by)
+                    VALUES (?, ?, ?)
+                """, (crypto_type.upper(), wallet_address, admin_id))
+                return True
+            except Exception as e:
+                logger.error(f"Error setting wallet address: {e}")
+                return False
 
     def get_wallet_address(self, crypto_type):
         """Get wallet address for a cryptocurrency"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT wallet_address FROM wallet_addresses 
-                WHERE crypto_type = ?
-            """, (crypto_type.upper(),))
-            result = cursor.fetchone()
-            return result[0] if result else None
-        except Exception as e:
-            logger.error(f"Error getting wallet address: {e}")
-            return None
-        finally:
-            conn.close()
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("""
+                    SELECT wallet_address FROM wallet_addresses 
+                    WHERE crypto_type = ?
+                """, (crypto_type.upper(),))
+                result = cursor.fetchone()
+                return result[0] if result else None
+            except Exception as e:
+                logger.error(f"Error getting wallet address: {e}")
+                return None
 
     def get_all_wallet_addresses(self):
         """Get all wallet addresses"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT crypto_type, wallet_address, updated_at 
-                FROM wallet_addresses 
-                ORDER BY crypto_type
-            """)
-            results = cursor.fetchall()
-            return [dict(row) for row in results]
-        except Exception as e:
-            logger.error(f"Error getting wallet addresses: {e}")
-            return []
-        finally:
-            conn.close()
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("""
+                    SELECT crypto_type, wallet_address, updated_at 
+                    FROM wallet_addresses 
+                    ORDER BY crypto_type
+                """)
+                results = cursor.fetchall()
+                return [dict(row) for row in results]
+            except Exception as e:
+                logger.error(f"Error getting wallet addresses: {e}")
+                return []
 
 
     def get_all_users(self):
         """Get all users"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT * FROM users ORDER BY created_at DESC")
-            results = cursor.fetchall()
-            return [dict(row) for row in results]
-        except Exception as e:
-            logger.error(f"Error getting all users: {e}")
-            return []
-        finally:
-            conn.close()
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT * FROM users ORDER BY created_at DESC")
+                results = cursor.fetchall()
+                return [dict(row) for row in results]
+            except Exception as e:
+                logger.error(f"Error getting all users: {e}")
+                return []
 
     def get_pending_deposits(self):
         """Get pending deposits"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT * FROM deposits 
-                WHERE status = 'pending' 
-                ORDER BY created_at DESC
-            """)
-            results = cursor.fetchall()
-            return [dict(row) for row in results]
-        except Exception as e:
-            logger.error(f"Error getting pending deposits: {e}")
-            return []
-        finally:
-            conn.close()
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("""
+                    SELECT * FROM deposits 
+                    WHERE status = 'pending' 
+                    ORDER BY created_at DESC
+                """)
+                results = cursor.fetchall()
+                return [dict(row) for row in results]
+            except Exception as e:
+                logger.error(f"Error getting pending deposits: {e}")
+                return []
 
     def get_pending_withdrawals(self):
         """Get pending withdrawals"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT * FROM withdrawals 
-                WHERE status = 'pending' 
-                ORDER BY created_at DESC
-            """)
-            results = cursor.fetchall()
-            return [dict(row) for row in results]
-        except Exception as e:
-            logger.error(f"Error getting pending withdrawals: {e}")
-            return []
-        finally:
-            conn.close()
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("""
+                    SELECT * FROM withdrawals 
+                    WHERE status = 'pending' 
+                    ORDER BY created_at DESC
+                """)
+                results = cursor.fetchall()
+                return [dict(row) for row in results]
+            except Exception as e:
+                logger.error(f"Error getting pending withdrawals: {e}")
+                return []
 
     def get_stats(self):
         """Get platform statistics"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            # Get user stats
-            cursor.execute("SELECT COUNT(*) as total_users FROM users")
-            total_users = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT SUM(balance) as total_balance FROM users")
-            total_balance = cursor.fetchone()[0] or 0
-            
-            cursor.execute("SELECT COUNT(*) as total_bets FROM bets")
-            total_bets = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) as total_wins FROM bets WHERE result = 'win'")
-            total_wins = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) as total_losses FROM bets WHERE result = 'loss'")
-            total_losses = cursor.fetchone()[0]
-            
-            return {
-                'total_users': total_users,
-                'total_balance': total_balance,
-                'total_bets': total_bets,
-                'total_wins': total_wins,
-                'total_losses': total_losses
-            }
-        except Exception as e:
-            logger.error(f"Error getting stats: {e}")
-            return {}
-        finally:
-            conn.close()
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
+            try:
+                # Get user stats
+                cursor.execute("SELECT COUNT(*) as total_users FROM users")
+                total_users = cursor.fetchone()[0]
+                
+                cursor.execute("SELECT SUM(balance) as total_balance FROM users")
+                total_balance = cursor.fetchone()[0] or 0
+                
+                cursor.execute("SELECT COUNT(*) as total_bets FROM bets")
+                total_bets = cursor.fetchone()[0]
+                
+                cursor.execute("SELECT COUNT(*) as total_wins FROM bets WHERE result = 'win'")
+                total_wins = cursor.fetchone()[0]
+                
+                cursor.execute("SELECT COUNT(*) as total_losses FROM bets WHERE result = 'loss'")
+                total_losses = cursor.fetchone()[0]
+                
+                return {
+                    'total_users': total_users,
+                    'total_balance': total_balance,
+                    'total_bets': total_bets,
+                    'total_wins': total_wins,
+                    'total_losses': total_losses
+                }
+            except Exception as e:
+                logger.error(f"Error getting stats: {e}")
+                return {}
+
+    def get_pool_status(self):
+        """Get connection pool state"""
+        return self.pool.status()
 
     def request_deposit(self, user_id, amount):
         """Request a deposit"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                INSERT INTO deposits (user_id, amount, status, created_at)
-                VALUES (?, ?, 'pending', CURRENT_TIMESTAMP)
-            """, (user_id, amount))
-            conn.commit()
-            return cursor.lastrowid
-        except Exception as e:
-            logger.error(f"Error requesting deposit: {e}")
-            return None
-        finally:
-            conn.close()
+        with self.pool.write() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("""
+                    INSERT INTO deposits (user_id, amount, status, created_at)
+                    VALUES (?, ?, 'pending', CURRENT_TIMESTAMP)
+                """, (user_id, amount))
+                return cursor.lastrowid
+            except Exception as e:
+                logger.error(f"Error requesting deposit: {e}")
+                return None
 
     def request_withdrawal(self, user_id, amount, method, wallet_address):
         """Request a withdrawal"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                INSERT INTO withdrawals (user_id, amount, method, wallet_address, status, created_at)
-                VALUES (?, ?, ?, ?, 'pending', CURRENT_TIMESTAMP)
-            """, (user_id, amount, method, wallet_address))
-            conn.commit()
-            return cursor.lastrowid
-        except Exception as e:
-            logger.error(f"Error requesting withdrawal: {e}")
-            return None
-        finally:
-            conn.close()
+        with self.pool.write() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("""
+                    INSERT INTO withdrawals (user_id, amount, method, wallet_address, status, created_at)
+                    VALUES (?, ?, ?, ?, 'pending', CURRENT_TIMESTAMP)
+                """, (user_id, amount, method, wallet_address))
+                return cursor.lastrowid
+            except Exception as e:
+                logger.error(f"Error requesting withdrawal: {e}")
+                return None
 
     def log_action(self, user_id, action, details):
         """Log admin action"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                INSERT INTO admin_logs (user_id, action, details, created_at)
-                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-            """, (user_id, action, details))
-            conn.commit()
-            return True
-        except Exception as e:
-            logger.error(f"Error logging action: {e}")
-            return False
-        finally:
-            conn.close()
+        with self.pool.write() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("""
+                    INSERT INTO admin_logs (user_id, action, details, created_at)
+                    VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                """, (user_id, action, details))
+                return True
+            except Exception as e:
+                logger.error(f"Error logging action: {e}")
+                return False
+
+
+class AsyncDatabase:
+    """
+    Awaitable twin of Database for the async bot handlers.
+    
+    Exposes every Database method as a coroutine that runs the call on a
+    dedicated thread pool sized to the connection pool (its readers plus the
+    writer), so a commit waiting on disk never blocks the event loop and
+    concurrent users' reads run side by side.
+    """
+
+    def __init__(self, database, workers=DB_READER_CONNECTIONS + 1):
+        self.db = database
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db")
+        self._methods = {}
+
+    def __getattr__(self, name):
+        method = getattr(self.db, name)
+        if not callable(method):
+            return method
+        
+        wrapper = self._methods.get(name)
+        if wrapper is None:
+            async def wrapper(*args, **kwargs):
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, partial(method, *args, **kwargs))
+            wrapper.__name__ = name
+            wrapper.__doc__ = method.__doc__
+            self._methods[name] = wrapper
+        return wrapper
+
+    async def close(self):
+        """
+        Wait for running calls, stop the DB threads and close the pooled connections
+        """
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown, True)
+        self.db.pool.close()
 
 
 # Initialize database
 db = Database()
+async_db = AsyncDatabase(db)
@@ -3,9 +3,17 @@ import asyncio
 from datetime import datetime
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, ContextTypes, ConversationHandler, MessageHandler, filters, CallbackQueryHandler
-from config import TELEGRAM_BOT_TOKEN, ADMIN_ID, MIN_BET_AMOUNT, MAX_BET_AMOUNT, CURRENCY_SYMBOL, CURRENCY, INITIAL_BALANCE
-from database import db
-from api_handler import odds_api
+from config import TELEGRAM_BOT_TOKEN, ADMIN_ID, MIN_BET_AMOUNT, MAX_BET_AMOUNT, CURRENCY_SYMBOL, CURRENCY, INITIAL_BALANCE, ODDS_POLLER_ENABLED, ODDS_TYPES, ODDS_HISTORY_ENABLED
+from database import async_db
+from odds_cache import odds_provider, odds_cache, listing_cache
+from odds_poller import odds_poller
+from odds_budget import request_budget
+from odds_history import odds_history
+from odds_store import snapshot_store
+from odds_index import UPCOMING_PAGE_SIZE
+from odds_render import render_cache
+from odds_pricing import consensus_price, format_pricing_display
+from odds_format import format_price, potential_win
 from voice_handler import voice_handler
 from ai_integration import ai_assistant
 
@@ -42,6 +50,11 @@ class FakeUpdate:
         return self._effective_user
 
 
+def league_label(sport):
+    """Short league name of a sport key (americanfootball_nfl -> NFL)"""
+    return sport.rsplit("_", 1)[-1].upper()
+
+
 class BettingBot:
     def __init__(self):
         self.app = None
@@ -60,14 +73,56 @@ class BettingBot:
             if update.callback_query:
                 await update.callback_query.answer(f"❌ Error: {str(e)}", show_alert=True)
 
+    def format_odds_budget(self):
+        """Format the Odds API quota budget for the admin statistics screens"""
+        scheduler = odds_poller.scheduler
+        status = request_budget.status(list(scheduler.intervals().values()))
+        if status['remaining'] is None:
+            return "\n<b>📡 Odds API Budget:</b>\n• No usage reported yet\n"
+        
+        text = f"""
+<b>📡 Odds API Budget:</b>
+• Remaining: {status['remaining']} requests
+• Used: {status['used']}
+• Resets: {status['next_reset'].strftime('%m/%d %H:%M UTC')}
+• Schedule throttle: x{status['throttle']:.1f}
+"""
+        if status['low']:
+            text += "• ⚠️ Quota low - sports without games soon are polled less often\n"
+        
+        health = odds_provider.health()
+        if health:
+            text += f"• ⚠️ {odds_provider.name}: {health}\n"
+        
+        text += "\n<b>⏱ Next Odds Polls:</b>\n"
+        for sport, seconds in sorted(scheduler.next_poll_times().items(), key=lambda item: item[1]):
+            text += f"• {sport}: {seconds / 60:.0f} min\n"
+        return text
+
+    def format_db_status(self, status):
+        """Format the database connection pool state for the admin statistics screens"""
+        return f"""
+<b>🗄 Database:</b>
+• Journal: {status['journal_mode']}
+• Readers: {status['readers']} open, {status['idle_readers']} idle
+• Reconnects: {status['reconnects']}
+"""
+
+    def stale_notice(self, age):
+        """Warning shown while the odds provider is down and cached odds are served instead"""
+        # Age alone means nothing: idle sports are polled only every few hours on purpose
+        if odds_provider.is_available or age is None:
+            return ""
+        return f"\n⚠️ <i>Odds provider unavailable - showing odds from {max(age / 60, 1):.0f} min ago</i>\n"
+
     async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Start command - Welcome message and user registration"""
         user = update.effective_user
         user_id = user.id
         
         # Register user if new
-        if not db.user_exists(user_id):
-            db.add_user(user_id, user.username or "unknown", user.first_name, user.last_name or "")
+        if not await async_db.user_exists(user_id):
+            await async_db.add_user(user_id, user.username or "unknown", user.first_name, user.last_name or "")
             welcome_text = f"""
 <b>🇺🇸 Welcome to USA Sports Betting Bot! 🇺🇸</b>
 
@@ -98,7 +153,7 @@ I'm your AI-powered sports betting assistant. Get smart picks for:
 <i>Disclaimer: This is for educational purposes only. Gamble responsibly!</i>
 """
         else:
-            balance = db.get_user_balance(user_id)
+            balance = await async_db.get_user_balance(user_id)
             welcome_text = f"""
 <b>🇺🇸 Welcome Back, {user.first_name}! 👋</b>
 
@@ -189,7 +244,7 @@ Select an option below:
         query = update.callback_query
         await query.answer()
         
-        users = db.get_all_users()
+        users = await async_db.get_all_users()
         total_users = len(users)
         
         message = f"""
@@ -224,8 +279,8 @@ Total Users: <b>{total_users}</b>
         query = update.callback_query
         await query.answer()
         
-        deposits = db.get_pending_deposits()
-        withdrawals = db.get_pending_withdrawals()
+        deposits = await async_db.get_pending_deposits()
+        withdrawals = await async_db.get_pending_withdrawals()
         
         message = f"""
 💳 <b>Transaction Management</b>
@@ -342,7 +397,7 @@ Total Users: <b>{total_users}</b>
         query = update.callback_query
         await query.answer()
         
-        stats = db.get_stats()
+        stats, pool_status = await asyncio.gather(async_db.get_stats(), async_db.get_pool_status())
         
         message = f"""
 📈 <b>Platform Statistics</b>
@@ -358,6 +413,8 @@ Total Users: <b>{total_users}</b>
 <b>Win Rate:</b> {((stats.get('total_wins', 0) / max(stats.get('total_bets', 1), 1)) * 100):.1f}%
 <b>Average Bet:</b> ${(stats.get('total_balance', 0) / max(stats.get('total_bets', 1), 1)):.2f}
 """
+        message += self.format_db_status(pool_status)
+        message += self.format_odds_budget()
         
         keyboard = [
             [InlineKeyboardButton("📊 Daily Stats", callback_data="admin_daily_stats"),
@@ -412,7 +469,7 @@ Total Users: <b>{total_users}</b>
         query = update.callback_query
         await query.answer()
         
-        deposits = db.get_pending_deposits()
+        deposits = await async_db.get_pending_deposits()
         
         message = f"""
 💸 <b>Pending Deposits</b>
@@ -448,7 +505,7 @@ Total Users: <b>{total_users}</b>
         query = update.callback_query
         await query.answer()
         
-        withdrawals = db.get_pending_withdrawals()
+        withdrawals = await async_db.get_pending_withdrawals()
         
         message = f"""
 💸 <b>Pending Withdrawals</b>
@@ -522,7 +579,7 @@ Total Users: <b>{total_users}</b>
         await query.answer()
         
         # Get current wallet addresses
-        wallets = db.get_all_wallet_addresses()
+        wallets = await async_db.get_all_wallet_addresses()
         wallet_info = ""
         for wallet in wallets:
             wallet_info += f"• {wallet['crypto_type']}: {wallet['wallet_address'][:10]}...\n"
@@ -576,7 +633,7 @@ Total Users: <b>{total_users}</b>
             return
         
         # Get current wallet addresses
-        wallets = db.get_all_wallet_addresses()
+        wallets = await async_db.get_all_wallet_addresses()
         
         message = """
 💰 <b>Wallet Address Management</b>
@@ -625,7 +682,7 @@ Total Users: <b>{total_users}</b>
         context.user_data['setting_crypto'] = crypto_type
         
         # Get current address if exists
-        current_address = db.get_wallet_address(crypto_type)
+        current_address = await async_db.get_wallet_address(crypto_type)
         
         message = f"""
 💰 <b>Set {crypto_type} Wallet Address</b>
@@ -690,7 +747,7 @@ Current Address:
             return ASKING_WALLET_ADDRESS
         
         # Save wallet address
-        if db.set_wallet_address(crypto_type, wallet_address, user_id):
+        if await async_db.set_wallet_address(crypto_type, wallet_address, user_id):
             message = f"""
 ✅ <b>{crypto_type} Wallet Address Updated!</b>
 
@@ -717,7 +774,7 @@ Current Address:
             )
             
             # Log admin action
-            db.log_action(user_id, f"set_{crypto_type.lower()}_wallet", f"Updated {crypto_type} wallet address")
+            await async_db.log_action(user_id, f"set_{crypto_type.lower()}_wallet", f"Updated {crypto_type} wallet address")
             
         else:
             await update.message.reply_text("❌ Failed to save wallet address. Please try again.")
@@ -726,9 +783,17 @@ Current Address:
         return ConversationHandler.END
 
     async def live_matches(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Show live matches"""
+        """Show the game board of every league, optionally filtered to one"""
         try:
-            matches = odds_api.get_live_matches()
+            league = None
+            if update.callback_query and update.callback_query.data.startswith("live_"):
+                league = update.callback_query.data[len("live_"):]
+            
+            # Merged from cached feeds only: no API call however many leagues are enabled
+            matches, leagues = odds_poller.board([league] if league else None)
+            if not matches and not leagues:
+                # Nothing cached yet: fall back to the default sport's listing
+                matches = await odds_poller.get_live_matches()
             
             if not matches:
                 await self.send_or_edit_message(
@@ -738,19 +803,31 @@ Current Address:
                 )
                 return
             
-            message_text = "<b>🏆 Live USA Sports Games</b>\n\n"
+            title = league_label(league) if league else "USA Sports"
+            message_text = f"<b>🏆 Live {title} Games</b>\n"
+            message_text += self.stale_notice(odds_poller.snapshot_age([league] if league else None)) + "\n"
             
             keyboard = []
             for idx, match in enumerate(matches[:8], 1):
                 home = match['home_team']
                 away = match['away_team']
-                message_text += f"<b>{idx}.</b> {home} <b>vs</b> {away}\n"
+                status = "🔴 " if match['status'] == "live" else ""
+                message_text += f"<b>{idx}.</b> {status}[{league_label(match['sport'])}] {home} <b>vs</b> {away}\n"
                 
                 keyboard.append([InlineKeyboardButton(
                     f"⚽ {home[:15]} vs {away[:15]}",
                     callback_data=f"match_{match['match_id']}"
                 )])
             
+            # League filter buttons, four per row
+            filters_row = [InlineKeyboardButton(f"{'✅ ' if league is None else ''}All", callback_data="live")]
+            filters_row += [
+                InlineKeyboardButton(f"{'✅ ' if sport == league else ''}{league_label(sport)}", callback_data=f"live_{sport}")
+                for sport in leagues
+            ]
+            if len(filters_row) > 1:
+                keyboard += [filters_row[i:i + 4] for i in range(0, len(filters_row), 4)]
+            
             keyboard.append([InlineKeyboardButton("🏠 Home", callback_data="home")])
             reply_markup = InlineKeyboardMarkup(keyboard)
             
@@ -765,27 +842,41 @@ Current Address:
             await self.send_or_edit_message(update, f"❌ Error: {str(e)}")
 
     async def upcoming_matches(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Show upcoming matches"""
+        """Show upcoming matches of every sport, a page at a time"""
         try:
-            matches = odds_api.get_upcoming_matches()
+            page = 0
+            if update.callback_query and update.callback_query.data.startswith("upcoming_page_"):
+                page = int(update.callback_query.data.rsplit("_", 1)[1])
+            
+            index = await odds_poller.get_commence_index()
+            matches, page, pages = index.page(page)
             
             if not matches:
                 await self.send_or_edit_message(update, "❌ No upcoming matches.")
                 return
             
-            message_text = "📅 <b>Upcoming Matches:</b>\n\n"
+            message_text = f"📅 <b>Upcoming Matches</b> (page {page + 1}/{pages}):\n\n"
             
-            for idx, match in enumerate(matches[:5], 1):
-                message_text += f"{idx}. {match['home_team']} vs {match['away_team']}\n"
-                message_text += f"   ⏰ {match['commence_time']}\n\n"
+            first = page * UPCOMING_PAGE_SIZE + 1
+            for idx, (match, commence) in enumerate(matches, first):
+                message_text += f"{idx}. {match.home_team} vs {match.away_team}\n"
+                message_text += f"   ⏰ {commence}\n\n"
             
             keyboard = []
-            for match in matches[:5]:
+            for match, _ in matches:
                 keyboard.append([InlineKeyboardButton(
-                    f"{match['home_team']} vs {match['away_team']}",
-                    callback_data=f"match_{match['match_id']}"
+                    f"{match.home_team} vs {match.away_team}",
+                    callback_data=f"match_{match.match_id}"
                 )])
             
+            navigation = []
+            if page > 0:
+                navigation.append(InlineKeyboardButton("⬅️ Previous", callback_data=f"upcoming_page_{page - 1}"))
+            if page < pages - 1:
+                navigation.append(InlineKeyboardButton("Next ➡️", callback_data=f"upcoming_page_{page + 1}"))
+            if navigation:
+                keyboard.append(navigation)
+            
             keyboard.append([InlineKeyboardButton("🏠 Home", callback_data="home")])
             reply_markup = InlineKeyboardMarkup(keyboard)
             
@@ -806,61 +897,79 @@ Current Address:
         
         match_id = query.data.split("_", 1)[1]
         context.user_data['selected_match_id'] = match_id
+        odds_type = await async_db.get_odds_format(query.from_user.id)
         
-        # Get match odds
-        odds_data = odds_api.get_match_odds(match_id)
+        # Rendered once per odds change and format, not once per tap
+        version = odds_poller.match_version(match_id)
+        rendered = render_cache.get(match_id, version, odds_type)
+        if rendered is None:
+            odds_data = await odds_cache.get_match_odds(match_id, odds_poller.sport_of(match_id))
+            if odds_data:
+                rendered = self.render_match(
+                    odds_data, odds_poller.get_pricing(match_id), odds_type,
+                    odds_poller.get_formatted_prices(match_id, odds_type)
+                )
+                # A poll that landed during the fetch has already invalidated this version
+                if odds_poller.match_version(match_id) == version:
+                    render_cache.put(match_id, version, odds_type, rendered)
         
-        if odds_data:
-            home = odds_data['home_team']
-            away = odds_data['away_team']
-            
-            message = f"""
+        if rendered:
+            message, reply_markup = rendered
+            await query.edit_message_text(
+                message + self.stale_notice(odds_cache.match_age(match_id)),
+                reply_markup=reply_markup,
+                parse_mode="HTML"
+            )
+        else:
+            await query.answer("❌ Could not retrieve match data", show_alert=True)
+
+    def render_match(self, odds_data, pricing, odds_type, formatted=None):
+        """Build the match screen text and keyboard"""
+        home = odds_data['home_team']
+        away = odds_data['away_team']
+        
+        message = f"""
 🏆 <b>Match Details</b>
 
 <b>{home} vs {away}</b>
-
-📊 <b>Odds:</b>
 """
-            
+        
+        if pricing:
+            # One consensus line per outcome instead of every bookmaker's price
+            message += format_pricing_display(pricing, odds_type, formatted)
+        else:
+            message += "\n📊 <b>Odds:</b>\n"
             for odd in odds_data['odds']:
                 team = odd['team']
                 odds_value = odd['odds']
-                message += f"\n  • {team}: <b>{odds_value:+.0f}</b>"
+                message += f"\n  • {team}: <b>{format_price(odds_value, odds_type)}</b>"
             
             if odds_data.get('spreads'):
                 message += "\n\n📈 <b>Spreads:</b>"
                 for spread in odds_data['spreads']:
-                    message += f"\n  • {spread['team']} {spread['spread']:+.1f}: <b>{spread['odds']:+.0f}</b>"
+                    message += f"\n  • {spread['team']} {spread['spread']:+.1f}: <b>{format_price(spread['odds'], odds_type)}</b>"
             
             if odds_data.get('totals'):
                 message += "\n\n🎯 <b>Totals:</b>"
                 for total in odds_data['totals']:
-                    message += f"\n  • {total['type']} {total['point']}: <b>{total['odds']:+.0f}</b>"
-            
-            # Only show "Place Bet" and "AI Tips" buttons
-            # Team selection happens AFTER user enters bet amount
-            keyboard = [
-                [InlineKeyboardButton("🎯 Place Bet", callback_data="start_bet"),
-                 InlineKeyboardButton("🤖 AI Tips", callback_data="get_ai_tip")],
-                [InlineKeyboardButton("🏠 Home", callback_data="home")]
-            ]
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            await query.edit_message_text(
-                message,
-                reply_markup=reply_markup,
-                parse_mode="HTML"
-            )
-        else:
-            await query.answer("❌ Could not retrieve match data", show_alert=True)
+                    message += f"\n  • {total['type']} {total['point']}: <b>{format_price(total['odds'], odds_type)}</b>"
+        
+        # Only show "Place Bet" and "AI Tips" buttons
+        # Team selection happens AFTER user enters bet amount
+        keyboard = [
+            [InlineKeyboardButton("🎯 Place Bet", callback_data="start_bet"),
+             InlineKeyboardButton("🤖 AI Tips", callback_data="get_ai_tip")],
+            [InlineKeyboardButton("🏠 Home", callback_data="home")]
+        ]
+        
+        return message, InlineKeyboardMarkup(keyboard)
 
     async def start_bet(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Start betting process"""
         query = update.callback_query
         user_id = query.from_user.id
         
-        balance = db.get_user_balance(user_id)
+        balance = await async_db.get_user_balance(user_id)
         
         if balance <= 0:
             await query.answer(f"❌ Your balance is insufficient. Current balance: {CURRENCY_SYMBOL} {balance}", show_alert=True)
@@ -896,10 +1005,11 @@ Enter the amount:
             context.user_data['bet_amount'] = amount
             
             match_id = context.user_data.get('selected_match_id')
-            odds_data = odds_api.get_match_odds(match_id)
+            odds_data = await odds_cache.get_match_odds(match_id, odds_poller.sport_of(match_id))
             
             if odds_data:
-                teams = [odd['team'] for odd in odds_data['odds']]
+                # One button per team, not one per bookmaker quote
+                teams = list(dict.fromkeys(odd['team'] for odd in odds_data['odds']))
                 keyboard = [[InlineKeyboardButton(team, callback_data=f"team_{team}")] for team in teams]
                 reply_markup = InlineKeyboardMarkup(keyboard)
                 
@@ -931,39 +1041,42 @@ Which team would you like to bet on?
         match_id = context.user_data.get('selected_match_id')
         
         # Get odds data
-        odds_data = odds_api.get_match_odds(match_id)
+        odds_data = await odds_cache.get_match_odds(match_id, odds_poller.sport_of(match_id))
         
         # Validate odds_data
         if not odds_data or not odds_data.get('odds'):
             await query.answer("❌ Odds data not available. Please try again.", show_alert=True)
             return ConversationHandler.END
         
-        # Find odds for selected team
-        selected_odds = None
-        for odd in odds_data['odds']:
-            if odd['team'] == team:
-                selected_odds = odd['odds']
-                break
+        # Price the bet off the consensus line shown on the match screen,
+        # falling back to the first bookmaker quoting the team
+        selected_odds = consensus_price(odds_poller.get_pricing(match_id), team)
+        if selected_odds is None:
+            for odd in odds_data['odds']:
+                if odd['team'] == team:
+                    selected_odds = odd['odds']
+                    break
         
         if selected_odds is not None:
-            # Calculate potential win for American odds
-            if selected_odds > 0:
-                potential_win = (amount * selected_odds) / 100
-            else:
-                potential_win = (amount * 100) / abs(selected_odds)
+            # Same payout engine as the stored bet
+            win = potential_win(amount, selected_odds)
             
-            bet_id = db.place_bet(user_id, match_id, team, selected_odds, amount)
+            placed = await async_db.place_bet(user_id, match_id, team, selected_odds, amount)
+            if placed is None:
+                await query.answer("❌ Your balance is insufficient for this bet.", show_alert=True)
+                return ConversationHandler.END
+            bet_id, balance = placed
             
             message = f"""
 ✅ <b>Bet successfully placed!</b>
 
 📊 Bet details:
 • Team: {team}
-• Odds: {selected_odds:+.0f}
+• Odds: {format_price(selected_odds, await async_db.get_odds_format(user_id))}
 • Bet amount: {CURRENCY_SYMBOL} {amount}
-• Potential win: {CURRENCY_SYMBOL} {potential_win:.2f}
+• Potential win: {CURRENCY_SYMBOL} {win:.2f}
 
-Your new balance: {CURRENCY_SYMBOL} {db.get_user_balance(user_id):.2f}
+Your new balance: {CURRENCY_SYMBOL} {balance:.2f}
 """
             
             await query.edit_message_text(message, parse_mode="HTML")
@@ -988,7 +1101,7 @@ Your new balance: {CURRENCY_SYMBOL} {db.get_user_balance(user_id):.2f}
     async def my_bets(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show user's bets"""
         user_id = update.effective_user.id
-        bets = db.get_user_bets(user_id)
+        bets = await async_db.get_user_bets(user_id)
         
         if not bets:
             keyboard = [[InlineKeyboardButton("🏠 Home", callback_data="home"),
@@ -1006,12 +1119,13 @@ Your new balance: {CURRENCY_SYMBOL} {db.get_user_balance(user_id):.2f}
         resolved_bets = [b for b in bets if b['status'] == 'resolved']
         
         if active_bets:
+            odds_type = await async_db.get_odds_format(user_id)
             message += "<b>🔴 Active Bets:</b>\n"
             for idx, bet in enumerate(active_bets[:5], 1):
                 message += f"""
 <b>{idx}.</b> {bet['team_name']}
   💰 Amount: {CURRENCY_SYMBOL} {bet['amount']}
-  📊 Odds: {bet['odds']}
+  📊 Odds: {format_price(bet['odds'], odds_type)}
   🎯 Potential Win: {CURRENCY_SYMBOL} {bet['potential_win']:.0f}
 """
         
@@ -1036,7 +1150,7 @@ Your new balance: {CURRENCY_SYMBOL} {db.get_user_balance(user_id):.2f}
     async def balance(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Check balance"""
         user_id = update.effective_user.id
-        user_info = db.get_user_info(user_id)
+        user_info = await async_db.get_user_info(user_id)
         
         if user_info:
             win_rate = (user_info['total_win'] / max(user_info['total_bet'], 1) * 100) if user_info['total_bet'] > 0 else 0
@@ -1177,7 +1291,7 @@ Second: 📸 Screenshot image
             
             # Get payment method and wallet address
             method = context.user_data.get('payment_method', 'BTC')
-            wallet = db.get_wallet_address(method)
+            wallet = await async_db.get_wallet_address(method)
             
             if not wallet:
                 await update.message.reply_text(
@@ -1250,7 +1364,7 @@ After sending, click "✅ I've Sent Payment" to upload proof.
             method = context.user_data.get('payment_method', 'BTC')
             tx_id = context.user_data.get('transaction_id', 'UNKNOWN')
             
-            deposit_id = db.request_deposit(user_id, amount)
+            deposit_id = await async_db.request_deposit(user_id, amount)
             
             # Save photo
             photo_path = f"D:/AIBetingBot/proofs/deposit_{deposit_id}.jpg"
@@ -1315,7 +1429,7 @@ Your deposit will be processed soon!
         await query.answer()
         
         user_id = query.from_user.id
-        balance = db.get_user_balance(user_id)
+        balance = await async_db.get_user_balance(user_id)
         
         if balance <= 0:
             await query.answer("❌ Insufficient balance for withdrawal", show_alert=True)
@@ -1391,7 +1505,7 @@ Enter your {method} wallet address:
                 method = context.user_data.get('withdraw_method', 'BTC')
                 wallet = context.user_data.get('withdraw_wallet', '')
                 
-                withdraw_id = db.request_withdrawal(user_id, amount, method, wallet)
+                withdraw_id = await async_db.request_withdrawal(user_id, amount, method, wallet)
                 
                 # Confirmation to user
                 message = f"""
@@ -1454,7 +1568,7 @@ Enter your {method} wallet address:
             return
         
         # Get match data
-        odds_data = odds_api.get_match_odds(match_id)
+        odds_data = await odds_cache.get_match_odds(match_id, odds_poller.sport_of(match_id))
         
         if odds_data:
             tip = ai_assistant.get_bet_suggestion(odds_data)
@@ -1601,7 +1715,7 @@ I can help you with:
         user_id = query.from_user.id
         
         # Get user's betting history for personalized tips
-        user_info = db.get_user_info(user_id)
+        user_info = await async_db.get_user_info(user_id)
         
         prompt = f"""
         User ID: {user_id}
@@ -1647,7 +1761,7 @@ I can help you with:
         user_id = query.from_user.id
         
         # Get recent matches for analysis
-        live_matches = odds_api.get_live_matches()
+        live_matches = await odds_poller.get_live_matches()
         
         if live_matches:
             # Pick the first match for analysis
@@ -1715,7 +1829,7 @@ Try asking me about a specific team or sport!
         await query.answer()
         
         user_id = query.from_user.id
-        user_info = db.get_user_info(user_id)
+        user_info = await async_db.get_user_info(user_id)
         balance = user_info.get('balance', 0)
         
         prompt = f"""
@@ -1855,7 +1969,7 @@ Try asking me about a specific team or sport!
         try:
             tx_id = context.args[0]
             
-            if db.approve_transaction(tx_id, ADMIN_ID):
+            if await async_db.approve_transaction(tx_id, ADMIN_ID):
                 await update.message.reply_text(f"✅ Deposit request #{tx_id} approved.")
                 logger.info(f"Deposit approved: TX {tx_id}")
             else:
@@ -1872,7 +1986,7 @@ Try asking me about a specific team or sport!
         try:
             tx_id = context.args[0]
             
-            if db.approve_transaction(tx_id, ADMIN_ID):
+            if await async_db.approve_transaction(tx_id, ADMIN_ID):
                 await update.message.reply_text(f"✅ Withdrawal request #{tx_id} approved.")
                 logger.info(f"Withdrawal approved: TX {tx_id}")
             else:
@@ -1886,9 +2000,10 @@ Try asking me about a specific team or sport!
             await update.message.reply_text("❌ This command is only for admins.")
             return
         
-        stats = db.get_stats()
-        users = db.get_all_users()
-        pending = db.get_pending_transactions()
+        stats, users, pending, pool_status = await asyncio.gather(
+            async_db.get_stats(), async_db.get_all_users(), async_db.get_pending_transactions(),
+            async_db.get_pool_status()
+        )
         
         message = f"""
 <b>📊 System Statistics</b>
@@ -1907,7 +2022,7 @@ Try asking me about a specific team or sport!
 <b>💰 Financial:</b>
 • Total Balance: {CURRENCY_SYMBOL} {stats.get('total_balance', 0):.0f}
 • Pending: {len(pending)} transactions
-
+{self.format_db_status(pool_status)}{self.format_odds_budget()}
 ━━━━━━━━━━━━━━━━━━
 
 <b>🏆 Top 10 Users:</b>
@@ -1938,10 +2053,10 @@ Try asking me about a specific team or sport!
         elif query.data == "help":
             fake_update = FakeUpdate(query)
             await self.help_command(fake_update, context)
-        elif query.data == "live":
+        elif query.data == "live" or query.data.startswith("live_"):
             fake_update = FakeUpdate(query)
             await self.live_matches(fake_update, context)
-        elif query.data == "upcoming":
+        elif query.data == "upcoming" or query.data.startswith("upcoming_page_"):
             fake_update = FakeUpdate(query)
             await self.upcoming_matches(fake_update, context)
         elif query.data == "balance":
@@ -1979,7 +2094,7 @@ Try asking me about a specific team or sport!
                 await query.answer("❌ Unauthorized", show_alert=True)
                 return
             tx_id = query.data.split("_")[-1]
-            if db.approve_transaction(tx_id, ADMIN_ID):
+            if await async_db.approve_transaction(tx_id, ADMIN_ID):
                 await query.edit_message_caption(
                     caption=f"✅ Deposit #{tx_id} approved.",
                 )
@@ -1990,7 +2105,7 @@ Try asking me about a specific team or sport!
                 await query.answer("❌ Unauthorized", show_alert=True)
                 return
             tx_id = query.data.split("_")[-1]
-            if db.reject_transaction(tx_id, ADMIN_ID):
+            if await async_db.reject_transaction(tx_id, ADMIN_ID):
                 await query.edit_message_caption(
                     caption=f"❌ Deposit #{tx_id} rejected.",
                 )
@@ -2001,7 +2116,7 @@ Try asking me about a specific team or sport!
                 await query.answer("❌ Unauthorized", show_alert=True)
                 return
             tx_id = query.data.split("_")[-1]
-            if db.approve_transaction(tx_id, ADMIN_ID):
+            if await async_db.approve_transaction(tx_id, ADMIN_ID):
                 await query.edit_message_text(
                     text=f"✅ Withdrawal #{tx_id} approved.",
                     parse_mode="HTML"
@@ -2013,14 +2128,22 @@ Try asking me about a specific team or sport!
                 await query.answer("❌ Unauthorized", show_alert=True)
                 return
             tx_id = query.data.split("_")[-1]
-            if db.reject_transaction(tx_id, ADMIN_ID):
+            if await async_db.reject_transaction(tx_id, ADMIN_ID):
                 await query.edit_message_text(
                     text=f"❌ Withdrawal #{tx_id} rejected.",
                     parse_mode="HTML"
                 )
             else:
                 await query.answer("❌ Transaction not found", show_alert=True)
-        elif query.data in ["settings", "about"]:
+        elif query.data in ["settings", "about"] or query.data.startswith("odds_format_"):
+            odds_type = await async_db.get_odds_format(query.from_user.id)
+            if query.data.startswith("odds_format_"):
+                selected = query.data[len("odds_format_"):]
+                if selected == odds_type:
+                    return
+                await async_db.set_odds_format(query.from_user.id, selected)
+                odds_type = await async_db.get_odds_format(query.from_user.id)
+            
             message = f"""
 <b>⚙️ Bot Settings</b>
 
@@ -2032,9 +2155,14 @@ Try asking me about a specific team or sport!
 <b>Database:</b> SQLite
 <b>Region:</b> USA 🇺🇸
 <b>Currency:</b> USD ($)
+<b>Odds format:</b> {ODDS_TYPES[odds_type]}
 ━━━━━━━━━━━━━━━━━━
 """
-            keyboard = [[InlineKeyboardButton("🏠 Home", callback_data="home")]]
+            keyboard = [
+                [InlineKeyboardButton(f"{'✅ ' if key == odds_type else ''}{key.title()}", callback_data=f"odds_format_{key}")
+                 for key in ODDS_TYPES],
+                [InlineKeyboardButton("🏠 Home", callback_data="home")]
+            ]
             await query.edit_message_text(
                 message,
                 reply_markup=InlineKeyboardMarkup(keyboard),
@@ -2136,6 +2264,24 @@ Try asking me about a specific team or sport!
         # Generic callback handler - LAST so specific patterns take priority
         self.app.add_handler(CallbackQueryHandler(self.handle_callback))
 
+    async def stop(self):
+        """Stop the application, then release shared resources"""
+        if self.app is not None:
+            if self.app.updater.running:
+                await self.app.updater.stop()
+            if self.app.running:
+                await self.app.stop()
+            await self.app.shutdown()
+        await self.close_resources()
+
+    async def close_resources(self):
+        """Flush queued writes and release pooled connections"""
+        await odds_poller.stop()
+        await odds_history.close()
+        await snapshot_store.close()
+        await async_db.close()
+        await odds_provider.close()
+
     async def run(self):
         """Run the bot"""
         self.app = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
@@ -2144,19 +2290,37 @@ Try asking me about a specific team or sport!
         
         logger.info("🤖 Betting Bot is starting...")
         
+        # Warm start: serve the odds saved by the last run until the first polls land.
+        # Restored before updates are accepted, so the first taps already see them.
+        listing_cache.restore()
+        odds_cache.restore()
+        odds_poller.restore()
+        
+        odds_poller.add_listener(render_cache.invalidate)
+        if ODDS_POLLER_ENABLED and ODDS_HISTORY_ENABLED:
+            odds_poller.add_listener(odds_history.record)
+        
         await self.app.initialize()
         await self.app.start()
         await self.app.updater.start_polling()
+        
+        # Keep odds for every league fresh in the background
+        if ODDS_POLLER_ENABLED:
+            odds_poller.start()
 
 
 async def main():
     """Main entry point"""
     bot = BettingBot()
-    await bot.run()
-    
-    # Keep the bot running
-    while True:
-        await asyncio.sleep(1)
+    try:
+        await bot.run()
+        
+        # Keep the bot running
+        while True:
+            await asyncio.sleep(1)
+    finally:
+        # run_polling() is not used, so PTB never calls a post_shutdown hook: clean up here
+        await bot.stop()
 
 
 if __name__ == "__main__":
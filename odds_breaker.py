@@ -0,0 +1,116 @@
+import time
+import logging
+from collections import deque
+from config import (
+    ODDS_BREAKER_WINDOW, ODDS_BREAKER_MIN_CALLS, ODDS_BREAKER_FAILURE_RATE, ODDS_BREAKER_SLOW_CALL,
+    ODDS_BREAKER_COOLDOWN, ODDS_BREAKER_MAX_COOLDOWN
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling a provider whose circuit is open
+    """
+
+
+class CircuitBreaker:
+    """
+    Trips when too many recent calls to a provider fail or are slow.
+    
+    The outcome of the last `window` calls is kept; once at least min_calls
+    are known and the share of failed or slow (>= slow_call seconds) ones
+    reaches failure_rate, the circuit opens and calls are refused without
+    touching the network. After the cooldown one probe call is let through:
+    success closes the circuit, failure opens it again with a doubled
+    cooldown (up to max_cooldown).
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, window=ODDS_BREAKER_WINDOW, min_calls=ODDS_BREAKER_MIN_CALLS,
+                 failure_rate=ODDS_BREAKER_FAILURE_RATE, slow_call=ODDS_BREAKER_SLOW_CALL,
+                 cooldown=ODDS_BREAKER_COOLDOWN, max_cooldown=ODDS_BREAKER_MAX_COOLDOWN):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call = slow_call
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.opened_at = None
+        self._results = deque(maxlen=window)  # True for every failed or slow call
+        self._probing = False
+
+    @property
+    def is_open(self):
+        return self.state != self.CLOSED
+
+    def allow(self):
+        """
+        Whether a call may go out now; in half-open state only the single probe may
+        """
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = self.HALF_OPEN
+            self._probing = False
+        if self.state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            logger.info(f"🔌 Probing {self.name} after {self.cooldown:.0f}s open")
+            return True
+        return False
+
+    def record(self, duration, failed):
+        """
+        Record the outcome of a call that allow() let through
+        """
+        bad = failed or duration >= self.slow_call
+        if self.state == self.HALF_OPEN:
+            if bad:
+                self._open(min(self.cooldown * 2, self.max_cooldown))
+            else:
+                self._close()
+            return
+        
+        self._results.append(bad)
+        if self.state == self.CLOSED and len(self._results) >= self.min_calls \
+                and sum(self._results) / len(self._results) >= self.failure_rate:
+            self._open(self.base_cooldown)
+
+    def _open(self, cooldown):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.cooldown = cooldown
+        self._probing = False
+        logger.warning(f"⚠️ {self.name} circuit opened for {cooldown:.0f}s")
+
+    def _close(self):
+        self.state = self.CLOSED
+        self.opened_at = None
+        self.cooldown = self.base_cooldown
+        self._results.clear()
+        self._probing = False
+        logger.info(f"✅ {self.name} circuit closed")
+
+    def retry_in(self):
+        """
+        Seconds until the next probe is allowed (0 when closed or probing)
+        """
+        if self.state != self.OPEN:
+            return 0
+        return max(self.cooldown - (time.monotonic() - self.opened_at), 0)
+
+    def status(self):
+        """
+        Current breaker state for the admin panel
+        """
+        return {
+            "state": self.state,
+            "recent_calls": len(self._results),
+            "recent_failures": sum(self._results),
+            "retry_in": self.retry_in(),
+        }
@@ -0,0 +1,126 @@
+import time
+import logging
+from datetime import datetime, timezone
+from config import ODDS_API_QUOTA_RESET_DAY, ODDS_BUDGET_LOW_FRACTION, ODDS_BUDGET_IDLE_SLOWDOWN
+
+logger = logging.getLogger(__name__)
+
+# Cost of one full /odds request (3 markets x 1 region) until the API reports it
+DEFAULT_REQUEST_COST = 3
+
+
+class RequestBudget:
+    """
+    Tracks The Odds API quota from the x-requests-* response headers.
+    
+    The remaining quota is spread evenly over the time left until the monthly
+    reset: when the polling schedule would spend it faster, every interval is
+    stretched by the same factor. When the quota runs low, sports without
+    games soon are slowed down further.
+    """
+
+    def __init__(self, reset_day=ODDS_API_QUOTA_RESET_DAY, low_fraction=ODDS_BUDGET_LOW_FRACTION,
+                 idle_slowdown=ODDS_BUDGET_IDLE_SLOWDOWN):
+        self.reset_day = max(1, min(reset_day, 28))  # every month has a 28th
+        self.low_fraction = low_fraction
+        self.idle_slowdown = idle_slowdown
+        self.remaining = None
+        self.used = None
+        self.last_cost = None
+        self.updated_at = None
+
+    def record(self, headers):
+        """
+        Update the quota from the usage headers of an Odds API response
+        """
+        try:
+            remaining = headers.get("x-requests-remaining")
+            used = headers.get("x-requests-used")
+            last = headers.get("x-requests-last")
+            if remaining is not None:
+                self.remaining = int(float(remaining))
+            if used is not None:
+                self.used = int(float(used))
+            if last is not None:
+                self.last_cost = int(float(last))
+            if remaining is not None or used is not None:
+                self.updated_at = time.time()
+        except (TypeError, ValueError) as e:
+            logger.warning(f"⚠️ Could not parse Odds API usage headers: {e}")
+
+    def next_reset(self, now=None):
+        """
+        Next quota reset (midnight UTC on reset_day of the month)
+        """
+        now = now or datetime.now(timezone.utc)
+        reset = now.replace(day=self.reset_day, hour=0, minute=0, second=0, microsecond=0)
+        if reset <= now:
+            if now.month == 12:
+                reset = reset.replace(year=now.year + 1, month=1)
+            else:
+                reset = reset.replace(month=now.month + 1)
+        return reset
+
+    def seconds_until_reset(self, now=None):
+        now = now or datetime.now(timezone.utc)
+        return max((self.next_reset(now) - now).total_seconds(), 1)
+
+    def is_low(self):
+        """
+        True once less than low_fraction of the monthly quota is left
+        """
+        if self.remaining is None or self.used is None:
+            return False
+        total = self.remaining + self.used
+        return total > 0 and self.remaining < total * self.low_fraction
+
+    def allowed_rate(self):
+        """
+        Requests per second that make the remaining quota last until the reset
+        """
+        if self.remaining is None:
+            return None
+        return max(self.remaining, 0) / self.seconds_until_reset()
+
+    def slowdown(self, games_soon):
+        """
+        Extra interval multiplier for a sport, applied only while the quota is low
+        """
+        if not games_soon and self.is_low():
+            return self.idle_slowdown
+        return 1
+
+    def throttle(self, intervals):
+        """
+        Factor (>= 1) to stretch every poll interval by so the schedule fits the budget
+        """
+        rate = self.allowed_rate()
+        if rate is None or not intervals:
+            return 1
+        if rate <= 0:
+            # Nothing left: next polls land on the reset
+            return self.seconds_until_reset() / min(intervals)
+        
+        cost = self.last_cost or DEFAULT_REQUEST_COST
+        demand = sum(cost / interval for interval in intervals)
+        return max(demand / rate, 1)
+
+    def status(self, intervals=None):
+        """
+        Current budget state for the admin panel
+        """
+        status = {
+            "remaining": self.remaining,
+            "used": self.used,
+            "last_cost": self.last_cost,
+            "low": self.is_low(),
+            "next_reset": self.next_reset(),
+            "updated_at": self.updated_at,
+        }
+        if intervals:
+            status["throttle"] = self.throttle(intervals)
+        return status
+
+
+# Initialize request budget
+request_budget = RequestBudget()
@@ -0,0 +1,326 @@
+import time
+import asyncio
+import logging
+from config import (
+    ODDS_CACHE_TTL, ODDS_CACHE_MAX_STALE, ODDS_EVENTS_CACHE_TTL, ODDS_EVENTS_CACHE_MAX_STALE, ODDS_SPORTS_CACHE_TTL,
+    DEFAULT_SPORT, ODDS_PROVIDER, ODDS_PROVIDER_DIR
+)
+from api_handler import async_odds_api, parse_sports_list
+from odds_provider import FileOddsProvider
+from odds_breaker import CircuitOpenError
+from odds_store import snapshot_store
+from odds_matrix import build_feed, live_matches, upcoming_matches
+
+logger = logging.getLogger(__name__)
+
+# Only feeds carrying every market are complete enough to answer match screens
+FULL_MARKETS = "h2h,spreads,totals"
+
+
+class OddsCache:
+    """
+    Single-flight TTL cache in front of an OddsProvider.
+    
+    /odds feeds are cached per (sport, markets, regions) as tuples of compact
+    EventOdds; /events listings, which have neither, per sport only. Concurrent misses for the same key share one upstream request,
+    and an expired entry keeps being served for up to max_stale seconds while
+    a background refresh runs.
+    
+    While the provider is unavailable (its circuit breaker is open), entries
+    are served whatever their age; the background refresh then fails fast
+    until the breaker lets a probe through.
+    
+    Every full-market feed also fills an index from match_id to its event, so
+    match screens are answered without another round trip.
+    
+    Sports in polled_sports are refreshed by the odds poller on its quota-paced
+    schedule only: for them the cache serves whatever it holds, whatever its
+    age, and never goes upstream itself.
+    
+    With endpoint="events" the cache holds the odds-free /events listings
+    instead: enough for match menus, and they cost no quota.
+    
+    With a store, every fetched feed (and the sports list) is also saved to
+    disk, and restore() loads them back at startup with their real age.
+    """
+
+    def __init__(self, provider, ttl=ODDS_CACHE_TTL, max_stale=ODDS_CACHE_MAX_STALE, endpoint="odds", store=None):
+        self.provider = provider
+        self.endpoint = endpoint
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.store = store
+        self._sports = None  # (fetched_at, sports list)
+        self._entries = {}  # key -> (fetched_at, events)
+        self._inflight = {}  # key -> asyncio.Task
+        self._events = {}  # match_id -> {"fetched_at", "sport", "event", "odds"}
+        self._sport_events = {}  # sport -> set of indexed match_ids
+        self.polled_sports = frozenset()  # sports the running odds poller keeps fresh
+
+    def _key(self, sport, markets=FULL_MARKETS, regions="us"):
+        """
+        Cache key of a feed; listings ignore markets and regions
+        """
+        if self.endpoint == "events":
+            return (sport,)
+        return (sport, markets, regions)
+
+    def _indexed(self, key):
+        """
+        Whether a feed fills the match index: listings and full-market feeds do
+        """
+        return self.endpoint == "events" or key[1] == FULL_MARKETS
+
+    def _start_refresh(self, key):
+        """
+        Return the running refresh for a key, starting one if none is in flight
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._refresh(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._refresh_done(key, t))
+        return task
+
+    def _refresh_done(self, key, task):
+        """
+        Forget a finished refresh and consume its error so it is never left unretrieved
+        """
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled() or task.exception() is None:
+            return
+        if isinstance(task.exception(), CircuitOpenError):
+            logger.debug(f"Odds refresh skipped for {key}: {task.exception()}")
+        else:
+            logger.warning(f"⚠️ Odds refresh failed for {key}: {task.exception()!r}")
+
+    async def _refresh(self, key):
+        """
+        Fetch a feed from upstream and store it
+        """
+        sport = key[0]
+        if self.endpoint == "events":
+            data = await self.provider.fetch_events(sport)
+        else:
+            data = await self.provider.fetch_odds(sport, markets=key[1], regions=key[2])
+        started = time.perf_counter()
+        events = build_feed(data, sport)
+        fetched_at = time.monotonic()
+        logger.debug(f"Decoded {len(events)} {sport} events in {(time.perf_counter() - started) * 1000:.1f}ms")
+        self._entries[key] = (fetched_at, events)
+        if self.store is not None:
+            self.store.save_feed(self._snapshot_name(key), events)
+        if self._indexed(key):
+            # Listings are indexed too, so a match's sport is known before its odds are
+            self._index_events(sport, events, fetched_at)
+        return events
+
+    def _index_events(self, sport, events, fetched_at):
+        """
+        Replace the indexed events of a sport with the events of a fresh feed
+        """
+        match_ids = set()
+        for event in events:
+            match_ids.add(event.match_id)
+            self._events[event.match_id] = {
+                "fetched_at": fetched_at,
+                "sport": sport,
+                "event": event,
+                "odds": None  # built on first lookup
+            }
+        
+        # Events that left the feed (finished or pulled) are no longer bettable
+        for match_id in self._sport_events.get(sport, set()) - match_ids:
+            self._events.pop(match_id, None)
+        self._sport_events[sport] = match_ids
+
+    def _snapshot_name(self, key):
+        return ".".join((self.endpoint, *key))
+
+    def restore(self):
+        """
+        Load the feeds and sports list saved by the last run; returns the restored sports
+        """
+        if self.store is None:
+            return []
+        restored = []
+        for name in self.store.names(f"{self.endpoint}."):
+            snapshot = self.store.load_feed(name)
+            key = tuple(name.split(".")[1:])
+            if snapshot is None or len(key) != len(self._key(key[0])):
+                continue
+            saved_at, events = snapshot
+            # Entries keep their real age, so old ones are refreshed first
+            fetched_at = time.monotonic() - max(time.time() - saved_at, 0)
+            self._entries[key] = (fetched_at, events)
+            if self._indexed(key):
+                self._index_events(key[0], events, fetched_at)
+            restored.append(key[0])
+        
+        snapshot = self.store.load_json(f"{self.endpoint}-sports")
+        if snapshot is not None:
+            saved_at, sports = snapshot
+            self._sports = (time.monotonic() - max(time.time() - saved_at, 0), sports)
+        
+        if restored:
+            logger.info(f"💾 Restored {len(restored)} {self.endpoint} feeds from disk")
+        return restored
+
+    async def get_sports_list(self):
+        """
+        Available sports, fetched from upstream at most once per ODDS_SPORTS_CACHE_TTL
+        """
+        if self._sports is not None and time.monotonic() - self._sports[0] < ODDS_SPORTS_CACHE_TTL:
+            return self._sports[1]
+        
+        try:
+            sports = parse_sports_list(await self.provider.fetch_sports())
+        except Exception as e:
+            logger.error(f"❌ Error fetching sports list: {e!r}")
+            sports = None
+        if not sports:
+            # Upstream failed: keep serving the last list
+            return self._sports[1] if self._sports is not None else []
+        self._sports = (time.monotonic(), sports)
+        if self.store is not None:
+            self.store.save_json(f"{self.endpoint}-sports", sports)
+        return sports
+
+    async def refresh(self, sport, markets=FULL_MARKETS, regions="us"):
+        """
+        Force an upstream fetch of a feed (joining one already in flight); errors propagate
+        """
+        return await asyncio.shield(self._start_refresh(self._key(sport, markets, regions)))
+
+    def peek(self, sport, markets=FULL_MARKETS, regions="us"):
+        """
+        Cached feed of a sport whatever its age, or None; never hits upstream
+        """
+        entry = self._entries.get(self._key(sport, markets, regions))
+        return entry[1] if entry is not None else None
+
+    async def get_odds(self, sport, markets=FULL_MARKETS, regions="us"):
+        """
+        Get the odds feed of a sport as EventOdds, hitting upstream at most once per TTL
+        """
+        key = self._key(sport, markets, regions)
+        entry = self._entries.get(key)
+        
+        if sport in self.polled_sports and key == self._key(sport):
+            # Left to the poller's schedule, even before its first poll lands
+            return entry[1] if entry is not None else ()
+        
+        if entry is not None:
+            fetched_at, data = entry
+            age = time.monotonic() - fetched_at
+            if age < self.ttl:
+                return data
+            if age < self.ttl + self.max_stale or not self.provider.is_available:
+                # Stale-while-revalidate: answer now, refresh in the background
+                self._start_refresh(key)
+                return data
+        
+        try:
+            # shield() so one cancelled waiter does not cancel the shared fetch
+            return await asyncio.shield(self._start_refresh(key))
+        except Exception as e:
+            logger.error(f"❌ Error fetching odds feed for {sport}: {e!r}")
+            return entry[1] if entry is not None else ()
+
+    def age(self, sport, markets=FULL_MARKETS, regions="us"):
+        """
+        Seconds since a feed was fetched, or None when it is not cached
+        """
+        entry = self._entries.get(self._key(sport, markets, regions))
+        return time.monotonic() - entry[0] if entry is not None else None
+
+    def match_age(self, match_id):
+        """
+        Seconds since the odds of an indexed match were fetched, or None
+        """
+        entry = self._events.get(match_id)
+        return time.monotonic() - entry["fetched_at"] if entry is not None else None
+
+    def invalidate(self, sport=None):
+        """
+        Drop cached feeds for one sport, or for every sport
+        """
+        for key in list(self._entries):
+            if sport is None or key[0] == sport:
+                del self._entries[key]
+        for match_id, entry in list(self._events.items()):
+            if sport is None or entry["sport"] == sport:
+                del self._events[match_id]
+        if sport is None:
+            self._sport_events.clear()
+        else:
+            self._sport_events.pop(sport, None)
+
+    def _indexed_odds(self, entry):
+        """
+        Screen-ready odds of an indexed event, built on first use
+        """
+        if entry["odds"] is None:
+            entry["odds"] = entry["event"].to_match_odds()
+        return entry["odds"]
+
+    def get_event(self, match_id):
+        """
+        Indexed EventOdds of a match (whatever its age), or None; never hits upstream
+        """
+        entry = self._events.get(match_id)
+        return entry["event"] if entry is not None else None
+
+    async def get_match_odds(self, match_id, sport=None):
+        """
+        Detailed odds of a match, answered from the event index when possible
+        """
+        entry = self._events.get(match_id)
+        
+        if entry is None:
+            # Unknown match: one cached, shared feed fetch prices every match of its
+            # sport. A match the feed does not carry (no bookmaker prices it yet)
+            # stays unpriced until that feed is refreshed, without asking per tap.
+            await self.get_odds(sport or DEFAULT_SPORT)
+            entry = self._events.get(match_id)
+            return self._indexed_odds(entry) if entry is not None else None
+        
+        age = time.monotonic() - entry["fetched_at"]
+        if age < self.ttl or entry["sport"] in self.polled_sports:
+            return self._indexed_odds(entry)
+        if age < self.ttl + self.max_stale or not self.provider.is_available:
+            self._start_refresh(self._key(entry["sport"]))
+            return self._indexed_odds(entry)
+        
+        # Too old to serve: refresh the whole sport feed (shared with other callers).
+        # If that fails the old odds are shown with their age and the next poll
+        # recovers; a second upstream request would only fail the same way.
+        sport = entry["sport"]
+        await self.get_odds(sport)
+        age = self.age(sport)
+        if age is not None and age < self.ttl:
+            # Refreshed: a match missing from the new feed is no longer bettable
+            entry = self._events.get(match_id)
+        return self._indexed_odds(entry) if entry is not None else None
+
+    async def get_live_matches(self, sport="americanfootball_nfl"):
+        """
+        Live matches of a sport, served from the cached feed
+        """
+        return live_matches(await self.get_odds(sport))
+
+    async def get_upcoming_matches(self, sport="americanfootball_nfl", days=7):
+        """
+        Upcoming matches of a sport for the next N days, served from the cached feed
+        """
+        return upcoming_matches(await self.get_odds(sport), days)
+
+
+# Initialize odds provider and caches
+odds_provider = FileOddsProvider(ODDS_PROVIDER_DIR, shift_times=True) if ODDS_PROVIDER == "file" else async_odds_api
+odds_cache = OddsCache(odds_provider, store=snapshot_store)
+listing_cache = OddsCache(
+    odds_provider, ttl=ODDS_EVENTS_CACHE_TTL, max_stale=ODDS_EVENTS_CACHE_MAX_STALE, endpoint="events",
+    store=snapshot_store
+)
@@ -0,0 +1,60 @@
+import re
+import json
+import logging
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r"[ \t\n\r]*")
+
+
+def loads(raw):
+    """
+    Decode a whole JSON document from bytes or str, with orjson when it is installed
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def iter_array(raw, limit=None):
+    """
+    Yield the elements of a top-level JSON array as they are decoded, stopping after limit.
+    
+    Without a limit the document is decoded in one go (fastest with orjson).
+    With a limit, elements are decoded one at a time and the rest of the
+    payload is never turned into Python objects.
+    """
+    if limit is None:
+        data = loads(raw)
+        if not isinstance(data, list):
+            raise ValueError(f"Expected a JSON array, got {type(data).__name__}")
+        yield from data
+        return
+    
+    text = raw.decode("utf-8") if isinstance(raw, (bytes, bytearray)) else raw
+    idx = _whitespace.match(text, 0).end()
+    if text[idx:idx + 1] != "[":
+        raise ValueError("Expected a JSON array")
+    idx = _whitespace.match(text, idx + 1).end()
+    if text[idx:idx + 1] == "]":
+        return
+    
+    count = 0
+    while count < limit:
+        element, idx = _decoder.raw_decode(text, idx)
+        yield element
+        count += 1
+        idx = _whitespace.match(text, idx).end()
+        separator = text[idx:idx + 1]
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"Expected ',' or ']' at position {idx}")
+        idx = _whitespace.match(text, idx + 1).end()
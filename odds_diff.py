@@ -0,0 +1,85 @@
+import logging
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# One outcome price that appeared, disappeared or moved; old/new are (price, point) or None
+PriceChange = namedtuple("PriceChange", ["match_id", "bookmaker", "market", "outcome", "old", "new"])
+
+
+class ChangeSet(namedtuple("ChangeSet", [
+    "sport", "from_version", "to_version", "added", "removed", "moved",
+    "matches_added", "matches_removed", "matches_updated"
+])):
+    """
+    Compact delta between two feeds of one sport
+    """
+    __slots__ = ()
+
+    def __bool__(self):
+        return bool(
+            self.added or self.removed or self.moved
+            or self.matches_added or self.matches_removed or self.matches_updated
+        )
+
+    @property
+    def changed_matches(self):
+        """
+        Every match_id touched by this change set
+        """
+        matches = set(self.matches_added) | set(self.matches_removed) | set(self.matches_updated)
+        for change in self.added + self.removed + self.moved:
+            matches.add(change.match_id)
+        return matches
+
+    def summary(self):
+        return (
+            f"{self.sport} v{self.from_version}->v{self.to_version}: "
+            f"+{len(self.added)} -{len(self.removed)} ~{len(self.moved)} prices, "
+            f"+{len(self.matches_added)} -{len(self.matches_removed)} ~{len(self.matches_updated)} matches"
+        )
+
+
+def flatten_prices(events):
+    """
+    Map (match_id, bookmaker, market, outcome) -> (price, point) for a feed of EventOdds
+    """
+    prices = {}
+    for event in events:
+        for market_key, matrix in event.markets.items():
+            for bookmaker, outcome, price, point in matrix.entries():
+                prices[(event.match_id, bookmaker, market_key, outcome)] = (price, point)
+    return prices
+
+
+def flatten_matches(events):
+    """
+    Map match_id -> (home_team, away_team, commence_time) for a feed of EventOdds
+    """
+    return {
+        event.match_id: (event.home_team, event.away_team, event.commence_time)
+        for event in events
+    }
+
+
+def diff_feeds(sport, from_version, to_version, old_prices, new_prices, old_matches, new_matches):
+    """
+    Compare two flattened feeds of a sport and build their ChangeSet
+    """
+    added = [PriceChange(*key, None, new_prices[key]) for key in new_prices.keys() - old_prices.keys()]
+    removed = [PriceChange(*key, old_prices[key], None) for key in old_prices.keys() - new_prices.keys()]
+    moved = [
+        PriceChange(*key, old_prices[key], new_prices[key])
+        for key in new_prices.keys() & old_prices.keys()
+        if old_prices[key] != new_prices[key]
+    ]
+    matches_updated = [
+        match_id for match_id in new_matches.keys() & old_matches.keys()
+        if new_matches[match_id] != old_matches[match_id]
+    ]
+    return ChangeSet(
+        sport, from_version, to_version, added, removed, moved,
+        list(new_matches.keys() - old_matches.keys()),
+        list(old_matches.keys() - new_matches.keys()),
+        matches_updated
+    )
@@ -0,0 +1,105 @@
+import bisect
+import logging
+from array import array
+from fractions import Fraction
+from functools import lru_cache
+from config import ODDS_TYPES, DEFAULT_ODDS_TYPE
+
+logger = logging.getLogger(__name__)
+
+NAN = float("nan")
+
+# Fractions bookmakers actually quote; prices close to one of them are shown as it
+FRACTIONAL_LADDER = [
+    (1, 10), (1, 8), (1, 6), (1, 5), (2, 9), (1, 4), (2, 7), (1, 3), (4, 11), (2, 5), (4, 9),
+    (1, 2), (8, 15), (4, 7), (8, 13), (4, 6), (8, 11), (4, 5), (5, 6), (10, 11), (1, 1),
+    (21, 20), (11, 10), (6, 5), (5, 4), (11, 8), (6, 4), (13, 8), (7, 4), (15, 8), (2, 1),
+    (9, 4), (5, 2), (11, 4), (3, 1), (10, 3), (7, 2), (4, 1), (9, 2), (5, 1), (11, 2),
+    (6, 1), (13, 2), (7, 1), (15, 2), (8, 1), (9, 1), (10, 1), (12, 1), (14, 1), (16, 1),
+    (20, 1), (25, 1), (33, 1), (50, 1), (66, 1), (100, 1)
+]
+_LADDER_DECIMALS = array("d", [numerator / denominator + 1 for numerator, denominator in FRACTIONAL_LADDER])
+LADDER_TOLERANCE = 0.01
+
+
+def odds_type_or_default(odds_type):
+    """
+    odds_type if it is one of ODDS_TYPES, else DEFAULT_ODDS_TYPE
+    """
+    return odds_type if odds_type in ODDS_TYPES else DEFAULT_ODDS_TYPE
+
+
+def american_to_decimal(price):
+    if price > 0:
+        return price / 100 + 1
+    return 100 / -price + 1
+
+
+def decimal_to_american(decimal):
+    if decimal >= 2:
+        return round((decimal - 1) * 100)
+    return round(-100 / (decimal - 1))
+
+
+def to_decimal_array(prices):
+    """
+    Convert a sequence of American prices to an array('d') of decimal prices in one pass (NaN stays NaN)
+    """
+    return array("d", [
+        price / 100 + 1 if price > 0 else 100 / -price + 1 if price < 0 else NAN
+        for price in prices
+    ])
+
+
+@lru_cache(maxsize=4096)
+def decimal_to_fraction(decimal):
+    """
+    (numerator, denominator) of a decimal price, snapped to the bookmaker ladder when close
+    """
+    i = bisect.bisect_left(_LADDER_DECIMALS, decimal)
+    for j in (i - 1, i):
+        if 0 <= j < len(FRACTIONAL_LADDER) and abs(_LADDER_DECIMALS[j] - decimal) <= LADDER_TOLERANCE:
+            return FRACTIONAL_LADDER[j]
+    fraction = Fraction(decimal - 1).limit_denominator(100)
+    return fraction.numerator, fraction.denominator
+
+
+def format_decimal_price(decimal, odds_type=DEFAULT_ODDS_TYPE):
+    """
+    Display string of a decimal price in the given odds type
+    """
+    if decimal != decimal:
+        return "-"
+    odds_type = odds_type_or_default(odds_type)
+    if odds_type == "decimal":
+        return f"{decimal:.2f}"
+    if odds_type == "fractional":
+        # Rounded so equal prices share one memoized reduction
+        numerator, denominator = decimal_to_fraction(round(decimal, 4))
+        return f"{numerator}/{denominator}"
+    return f"{decimal_to_american(decimal):+.0f}"
+
+
+def format_price(price, odds_type=DEFAULT_ODDS_TYPE):
+    """
+    Display string of an American price in the given odds type
+    """
+    if odds_type_or_default(odds_type) == "american":
+        return f"{price:+.0f}"
+    return format_decimal_price(american_to_decimal(price), odds_type)
+
+
+def format_prices(prices, odds_type=DEFAULT_ODDS_TYPE):
+    """
+    Display strings of a whole sequence of American prices in one pass ("-" where NaN)
+    """
+    if odds_type_or_default(odds_type) == "american":
+        return [f"{price:+.0f}" if price == price else "-" for price in prices]
+    return [format_decimal_price(decimal, odds_type) for decimal in to_decimal_array(prices)]
+
+
+def potential_win(amount, price):
+    """
+    Profit of a winning stake at an American price (the stake itself is not included)
+    """
+    return round(amount * (american_to_decimal(price) - 1), 2)
@@ -0,0 +1,129 @@
+import time
+import logging
+from config import ODDS_HISTORY_DOWNSAMPLE, ODDS_HISTORY_COMPACT_INTERVAL
+from database import db
+from background_writer import BackgroundWriter
+
+logger = logging.getLogger(__name__)
+
+
+class OddsHistory:
+    """
+    Append-only time series of every price the poller has published.
+    
+    Each change set becomes one batch of (ts, match, bookmaker, market,
+    outcome, price, point) rows: new and moved prices, and a NULL price when
+    a line is pulled. Unchanged prices are not repeated, so a price holds
+    until the next row for the same key. Batches are written on one
+    background thread so the event loop never waits on SQLite, and the
+    match metadata of the batch is upserted into the matches table.
+    
+    Rows older than each ODDS_HISTORY_DOWNSAMPLE age keep only the last
+    price per bucket of that resolution.
+    """
+
+    def __init__(self, database, downsample=ODDS_HISTORY_DOWNSAMPLE, compact_interval=ODDS_HISTORY_COMPACT_INTERVAL):
+        self.db = database
+        self.downsample = sorted(downsample)
+        self.compact_interval = compact_interval
+        self._writer = BackgroundWriter("odds-history", "odds history")
+        self._last_compact = None
+
+    def record(self, old_snapshot, new_snapshot, changes):
+        """
+        Snapshot listener: queue the rows of a change set for writing
+        """
+        feed = new_snapshot.sports.get(changes.sport)
+        ts = int(feed.fetched_at if feed is not None else time.time())
+        rows = [
+            (ts, change.match_id, change.bookmaker, change.market, change.outcome, *(change.new or (None, None)))
+            for change in changes.added + changes.moved + changes.removed
+        ]
+        matches = [
+            (match_id, changes.sport, *feed.matches[match_id])
+            for match_id in changes.matches_added + changes.matches_updated
+            if feed is not None and match_id in feed.matches
+        ]
+        if rows or matches:
+            self.submit(rows, matches)
+
+    def submit(self, rows, matches=()):
+        """
+        Write a batch on the history thread, or right away outside an event loop
+        """
+        self._writer.submit(self.write, rows, matches)
+
+    def write(self, rows, matches=()):
+        """
+        Append one batch of price rows and upsert its matches in a single transaction
+        """
+        with self.db.pool.write() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                INSERT INTO odds_history (ts, match_id, bookmaker, market, outcome, price, point)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            cursor.executemany("""
+                INSERT INTO matches (match_id, sport, home_team, away_team, commence_time)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (match_id) DO UPDATE SET
+                    home_team = excluded.home_team,
+                    away_team = excluded.away_team,
+                    commence_time = excluded.commence_time,
+                    updated_at = CURRENT_TIMESTAMP
+            """, matches)
+        
+        if self._last_compact is None or time.monotonic() - self._last_compact >= self.compact_interval:
+            self._last_compact = time.monotonic()
+            self.compact()
+
+    def compact(self, now=None):
+        """
+        Downsample old rows to the last price per bucket; returns the number of rows removed
+        """
+        now = now or time.time()
+        removed = 0
+        with self.db.pool.write() as conn:
+            cursor = conn.cursor()
+            for age, resolution in self.downsample:
+                cutoff = int(now - age)
+                cursor.execute("""
+                    DELETE FROM odds_history WHERE ts < ? AND rowid NOT IN (
+                        SELECT MAX(rowid) FROM odds_history WHERE ts < ?
+                        GROUP BY match_id, bookmaker, market, outcome, ts / ?
+                    )
+                """, (cutoff, cutoff, resolution))
+                removed += cursor.rowcount
+        if removed:
+            logger.info(f"🗜 Downsampled odds history, removed {removed} rows")
+        return removed
+
+    def get_history(self, match_id, since=None, until=None, market=None):
+        """
+        Price rows of a match between two timestamps, oldest first
+        """
+        query = "SELECT ts, bookmaker, market, outcome, price, point FROM odds_history WHERE match_id = ? AND ts >= ?"
+        params = [match_id, int(since or 0)]
+        if until is not None:
+            query += " AND ts <= ?"
+            params.append(int(until))
+        if market is not None:
+            query += " AND market = ?"
+            params.append(market)
+        query += " ORDER BY ts"
+        
+        with self.db.pool.read() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            results = cursor.fetchall()
+        return [dict(row) for row in results]
+
+    async def close(self):
+        """
+        Wait for queued batches to be written and stop the history thread
+        """
+        await self._writer.close()
+
+
+# Initialize odds history
+odds_history = OddsHistory(db)
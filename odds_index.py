@@ -0,0 +1,73 @@
+import time
+import bisect
+import logging
+from array import array
+from datetime import datetime
+from api_handler import USA_TZ
+
+logger = logging.getLogger(__name__)
+
+# Upcoming matches shown per page
+UPCOMING_PAGE_SIZE = 5
+
+
+class CommenceIndex:
+    """
+    Events of every sport sorted by commence time.
+    
+    Built once per snapshot: timestamps and display labels are worked out
+    at build time, so "next N from a cursor" and "within D days" queries are
+    a bisect and a slice.
+    """
+    __slots__ = ("times", "events", "labels")
+
+    def __init__(self, events):
+        ordered = sorted(
+            (event for event in events if event.commence_ts is not None),
+            key=lambda event: (event.commence_ts, event.match_id)
+        )
+        self.times = array("d", [event.commence_ts for event in ordered])
+        self.events = tuple(ordered)
+        self.labels = tuple(
+            datetime.fromtimestamp(event.commence_ts, USA_TZ).strftime("%m/%d %H:%M ET") for event in ordered
+        )
+
+    def __len__(self):
+        return len(self.events)
+
+    def position(self, ts):
+        """
+        Index of the first event starting at or after ts
+        """
+        return bisect.bisect_left(self.times, ts)
+
+    def window(self, start_ts, end_ts):
+        """
+        (lo, hi) bounds of the events starting in [start_ts, end_ts]
+        """
+        return bisect.bisect_left(self.times, start_ts), bisect.bisect_right(self.times, end_ts)
+
+    def next_from(self, cursor, limit):
+        """
+        Up to limit (event, label) pairs starting at position cursor
+        """
+        return list(zip(self.events[cursor:cursor + limit], self.labels[cursor:cursor + limit]))
+
+    def within_days(self, days, now=None):
+        """
+        Events that have not started yet and start within the next N days
+        """
+        now = now or time.time()
+        lo, hi = self.window(now, now + days * 86400)
+        return self.events[lo:hi]
+
+    def page(self, page, days=7, size=UPCOMING_PAGE_SIZE, now=None):
+        """
+        One page of upcoming (event, label) pairs and the number of pages in the window
+        """
+        now = now or time.time()
+        lo, hi = self.window(now, now + days * 86400)
+        pages = max((hi - lo + size - 1) // size, 1)
+        page = max(min(page, pages - 1), 0)
+        start = lo + page * size
+        return self.next_from(start, min(size, hi - start)), page, pages
@@ -0,0 +1,194 @@
+import logging
+from array import array
+from itertools import islice
+from sys import intern
+from datetime import datetime, timedelta
+from api_handler import parse_commence_time, USA_TZ
+
+logger = logging.getLogger(__name__)
+
+NAN = float("nan")
+
+# Markets whose outcomes carry a line (handicap or total) next to the price
+POINT_MARKETS = ("spreads", "totals")
+
+
+class MarketMatrix:
+    """
+    Prices of one market as a bookmaker x outcome matrix.
+    
+    Prices (and points for spreads/totals) live row-major in flat
+    array('d') buffers, with NaN where a bookmaker does not offer an outcome.
+    Bookmaker and outcome names are interned and shared across events.
+    """
+    __slots__ = ("key", "bookmakers", "outcomes", "prices", "points")
+
+    def __init__(self, key, bookmakers, outcomes, prices, points=None):
+        self.key = key
+        self.bookmakers = bookmakers  # tuple of bookmaker titles (rows)
+        self.outcomes = outcomes  # tuple of outcome names (columns)
+        self.prices = prices
+        self.points = points
+
+    def price(self, bookmaker_idx, outcome_idx):
+        value = self.prices[bookmaker_idx * len(self.outcomes) + outcome_idx]
+        return None if value != value else value
+
+    def point(self, bookmaker_idx, outcome_idx):
+        if self.points is None:
+            return None
+        value = self.points[bookmaker_idx * len(self.outcomes) + outcome_idx]
+        return None if value != value else value
+
+    def column(self, outcome_idx):
+        """
+        Prices of one outcome across every bookmaker (NaN where not offered)
+        """
+        return self.prices[outcome_idx::len(self.outcomes)]
+
+    def entries(self):
+        """
+        Yield (bookmaker, outcome, price, point) for every offered price, row by row
+        """
+        width = len(self.outcomes)
+        for b, bookmaker in enumerate(self.bookmakers):
+            for o, outcome in enumerate(self.outcomes):
+                price = self.prices[b * width + o]
+                if price != price:
+                    continue
+                point = None
+                if self.points is not None:
+                    point = self.points[b * width + o]
+                    point = None if point != point else point
+                yield bookmaker, outcome, price, point
+
+
+class EventOdds:
+    """
+    Compact odds of one event: metadata plus one MarketMatrix per market
+    """
+    __slots__ = ("match_id", "sport", "home_team", "away_team", "commence_time", "commence_ts", "markets")
+
+    def __init__(self, match_id, sport, home_team, away_team, commence_time, markets):
+        self.match_id = match_id
+        self.sport = sport
+        self.home_team = home_team
+        self.away_team = away_team
+        self.commence_time = commence_time
+        try:
+            self.commence_ts = parse_commence_time(commence_time).timestamp()
+        except (AttributeError, ValueError):
+            self.commence_ts = None
+        self.markets = markets  # market key -> MarketMatrix
+
+    def to_match(self, status):
+        """
+        Match summary in the shape the listing screens use
+        """
+        return {
+            "match_id": self.match_id,
+            "sport": self.sport,
+            "home_team": self.home_team,
+            "away_team": self.away_team,
+            "commence_time": self.commence_time,
+            "event": self,
+            "status": status
+        }
+
+    def to_match_odds(self):
+        """
+        Moneyline, spread and total lists in the shape the match and bet screens use
+        """
+        odds_data = {
+            "match_id": self.match_id,
+            "home_team": self.home_team,
+            "away_team": self.away_team,
+            "commence_time": self.commence_time,
+            "odds": [],
+            "spreads": [],
+            "totals": []
+        }
+        h2h = self.markets.get("h2h")
+        if h2h is not None:
+            for bookmaker, team, price, _ in h2h.entries():
+                odds_data["odds"].append({"team": team, "odds": price, "bookmaker": bookmaker})
+        spreads = self.markets.get("spreads")
+        if spreads is not None:
+            for _, team, price, point in spreads.entries():
+                odds_data["spreads"].append({"team": team, "spread": point or 0, "odds": price})
+        totals = self.markets.get("totals")
+        if totals is not None:
+            for _, side, price, point in totals.entries():
+                odds_data["totals"].append({"type": side, "point": point or 0, "odds": price})
+        return odds_data
+
+
+def build_market(key, books, outcomes, rows):
+    """
+    Pack per-bookmaker {outcome_idx: (price, point)} rows into a MarketMatrix
+    """
+    width = len(outcomes)
+    prices = array("d", [NAN]) * (len(books) * width)
+    points = array("d", [NAN]) * (len(books) * width) if key in POINT_MARKETS else None
+    for b, row in enumerate(rows):
+        for o, (price, point) in row.items():
+            prices[b * width + o] = price
+            if points is not None and point is not None:
+                points[b * width + o] = point
+    return MarketMatrix(key, tuple(books), tuple(outcomes), prices, points)
+
+
+def build_event_odds(event, sport):
+    """
+    Convert one raw Odds API event into EventOdds
+    """
+    markets = {}  # market key -> (bookmaker titles, outcome name -> column, rows)
+    for bookmaker in event.get("bookmakers", ()):
+        title = intern(bookmaker.get("title") or bookmaker.get("key") or "Unknown")
+        for market in bookmaker.get("markets", ()):
+            books, outcomes, rows = markets.setdefault(intern(market["key"]), ([], {}, []))
+            row = {}
+            for outcome in market.get("outcomes", ()):
+                name = intern(outcome["name"])
+                column = outcomes.setdefault(name, len(outcomes))
+                row[column] = (outcome["price"], outcome.get("point"))
+            books.append(title)
+            rows.append(row)
+    
+    return EventOdds(
+        event["id"], sport, intern(event["home_team"]), intern(event["away_team"]), event["commence_time"],
+        {key: build_market(key, books, list(outcomes), rows) for key, (books, outcomes, rows) in markets.items()}
+    )
+
+
+def build_feed(data, sport, limit=None):
+    """
+    Convert a raw /odds payload (a list or a lazily decoded iterator) into a
+    tuple of at most limit EventOdds, skipping malformed events
+    """
+    events = []
+    for event in islice(data or (), limit):
+        try:
+            events.append(build_event_odds(event, sport))
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error(f"Missing field in match data: {e}")
+    return tuple(events)
+
+
+def live_matches(events, limit=8):
+    """
+    Live match list of a compact feed
+    """
+    return [event.to_match("live") for event in events[:limit]]
+
+
+def upcoming_matches(events, days=7, limit=8):
+    """
+    Upcoming match list of a compact feed for the next N days
+    """
+    cutoff = (datetime.now(USA_TZ) + timedelta(days=days)).timestamp()
+    matches = [
+        event.to_match("upcoming") for event in events
+        if event.commence_ts is not None and event.commence_ts <= cutoff
+    ]
+    return matches[:limit]
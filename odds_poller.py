@@ -0,0 +1,331 @@
+import time
+import heapq
+import bisect
+import asyncio
+import logging
+from itertools import islice
+from collections import namedtuple
+from types import MappingProxyType
+from config import (
+    SPORTS_LIST, LIVE_MATCHES_REFRESH_INTERVAL, ODDS_POLLER_CONCURRENCY, DEFAULT_SPORT, ODDS_IN_PLAY_WINDOW
+)
+from odds_cache import odds_cache, listing_cache
+from odds_scheduler import PollScheduler
+from odds_diff import flatten_prices, flatten_matches, diff_feeds
+from odds_matrix import live_matches, upcoming_matches
+from odds_pricing import price_feed, price_event, format_feed_prices
+from odds_index import CommenceIndex
+from odds_breaker import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+
+def start_time(event):
+    """
+    Sort key putting events without a commence time last
+    """
+    return event.commence_ts if event.commence_ts is not None else float("inf")
+
+# One sport's feed as of its last successful fetch (events sorted by start time), with the flattened views the diff needs
+# and the cross-bookmaker pricing of every match (match_id -> market -> MarketPricing)
+SportFeed = namedtuple("SportFeed", ["sport", "version", "fetched_at", "events", "prices", "matches", "pricing"])
+
+# Immutable view of every polled sport; a new version is published whenever odds change
+OddsSnapshot = namedtuple("OddsSnapshot", ["version", "created_at", "sports"])
+
+
+class OddsPoller:
+    """
+    Supervised background task that keeps every configured sport fresh.
+    
+    Each round fetches every due sport concurrently (at most max_concurrency
+    at a time) through the odds cache, so the event index is refilled as well,
+    and publishes a new versioned OddsSnapshot. Handlers only ever read the
+    current snapshot and fall back to the odds-free listing cache for sports
+    not polled yet. While it runs, the odds cache leaves the polled sports to
+    it, so handlers never spend quota outside the schedule.
+    
+    When a sport is due comes from the PollScheduler: games in play or about
+    to start are polled often, and the whole schedule fits the API quota.
+    """
+
+    def __init__(self, cache, sports=SPORTS_LIST, interval=LIVE_MATCHES_REFRESH_INTERVAL,
+                 max_concurrency=ODDS_POLLER_CONCURRENCY, scheduler=None, listings=None):
+        self.cache = cache
+        self.listings = listings or cache
+        self.sports = list(sports)
+        self.interval = interval
+        self.max_concurrency = max_concurrency
+        self.scheduler = scheduler or PollScheduler(self.sports)
+        self.snapshot = OddsSnapshot(0, None, MappingProxyType({}))
+        self._listeners = []
+        self._task = None
+        self._index = None  # (snapshot version, CommenceIndex)
+        self._match_versions = {}  # match_id -> snapshot version its odds last changed in
+        self._formatted = {}  # (sport, odds type) -> (feed version, format_feed_prices of the feed)
+
+    def add_listener(self, callback):
+        """
+        Call callback(old_snapshot, new_snapshot, changes) whenever a sport's odds change
+        """
+        self._listeners.append(callback)
+
+    def publish(self, sport, events, fetched_at=None):
+        """
+        Diff a fresh feed against the current one and publish a new snapshot if anything changed
+        """
+        fetched_at = fetched_at or time.time()
+        old = self.snapshot
+        events = tuple(sorted(events or (), key=start_time))
+        prices = flatten_prices(events)
+        matches = flatten_matches(events)
+        previous = old.sports.get(sport)
+        sports = dict(old.sports)
+        
+        if previous is None:
+            changes = diff_feeds(sport, 0, old.version + 1, {}, prices, {}, matches)
+        else:
+            changes = diff_feeds(
+                sport, previous.version, old.version + 1,
+                previous.prices, prices, previous.matches, matches
+            )
+            if not changes:
+                # Same odds: only the feed's age moves, the version stays
+                sports[sport] = previous._replace(fetched_at=fetched_at)
+                self.snapshot = old._replace(sports=MappingProxyType(sports))
+                return None
+        
+        # Only matches touched by the diff are priced again
+        pricing = price_feed(
+            events, previous.pricing if previous is not None else None, changes.changed_matches
+        )
+        version = old.version + 1
+        sports[sport] = SportFeed(sport, version, fetched_at, events, prices, matches, pricing)
+        self.snapshot = OddsSnapshot(version, time.time(), MappingProxyType(sports))
+        for match_id in changes.changed_matches:
+            self._match_versions[match_id] = version
+        for match_id in changes.matches_removed:
+            self._match_versions.pop(match_id, None)
+        logger.debug(f"Published {changes.summary()}")
+        
+        for callback in self._listeners:
+            try:
+                callback(old, self.snapshot, changes)
+            except Exception as e:
+                logger.error(f"❌ Snapshot listener failed for {sport}: {e}")
+        return changes
+
+    def restore(self):
+        """
+        Publish the feeds the cache restored from disk, with their real age, so
+        odds are served before the first poll; returns the restored sports
+        """
+        restored = []
+        for sport in self.sports:
+            events = self.cache.peek(sport)
+            if events is None:
+                continue
+            self.scheduler.update_events(sport, events)
+            self.publish(sport, events, fetched_at=time.time() - self.cache.age(sport))
+            restored.append(sport)
+        return restored
+
+    async def poll_sport(self, sport, semaphore):
+        """
+        Fetch and publish one sport, keeping its previous feed on failure
+        """
+        async with semaphore:
+            try:
+                events = await self.cache.refresh(sport)
+            except CircuitOpenError as e:
+                logger.debug(f"Poll skipped for {sport}, keeping previous feed: {e}")
+                self.scheduler.reschedule(sport)
+                return False
+            except Exception as e:
+                logger.warning(f"⚠️ Poll failed for {sport}, keeping previous feed: {e!r}")
+                self.scheduler.reschedule(sport)
+                return False
+        self.scheduler.update_events(sport, events)
+        self.publish(sport, events)
+        self.scheduler.reschedule(sport)
+        return True
+
+    async def poll_once(self, sports=None):
+        """
+        Fetch the given sports (all configured ones by default) concurrently with bounded concurrency
+        """
+        sports = self.sports if sports is None else sports
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = await asyncio.gather(*(self.poll_sport(sport, semaphore) for sport in sports))
+        logger.info(f"✅ Polled {sum(results)}/{len(sports)} sports (snapshot v{self.snapshot.version})")
+
+    async def _run(self):
+        while True:
+            due = self.scheduler.pop_due()
+            if due:
+                await self.poll_once(due)
+            await asyncio.sleep(max(self.scheduler.next_wake() - time.monotonic(), 1))
+
+    async def _supervise(self):
+        """
+        Keep the polling loop alive, restarting it with backoff if it crashes
+        """
+        backoff = 1
+        while True:
+            try:
+                await self._run()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Odds poller crashed, restarting in {backoff}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.interval)
+
+    def start(self):
+        """
+        Start polling in the background of the running event loop
+        """
+        if self._task is None or self._task.done():
+            # From now on only the poller refreshes these sports, on the scheduler's budget
+            self.cache.polled_sports = frozenset(self.sports)
+            self._task = asyncio.create_task(self._supervise())
+            logger.info(f"🔄 Odds poller started for {len(self.sports)} sports every {self.interval}s")
+
+    async def stop(self):
+        """
+        Cancel the background task and wait for it to finish
+        """
+        self.cache.polled_sports = frozenset()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_events(self, sport):
+        """
+        Events of a sport from the current snapshot, or None if not polled yet
+        """
+        feed = self.snapshot.sports.get(sport)
+        return feed.events if feed is not None else None
+
+    def snapshot_age(self, sports=None, now=None):
+        """
+        Seconds since the least recently fetched of the given sports (every polled
+        sport by default) was last fetched, or None if none of them was polled yet
+        """
+        feeds = self.snapshot.sports
+        fetched = [feeds[sport].fetched_at for sport in (feeds if sports is None else sports) if sport in feeds]
+        if not fetched:
+            return None
+        return (now or time.time()) - min(fetched)
+
+    def match_version(self, match_id):
+        """
+        Snapshot version in which a match's odds last changed, or None if it is not in the snapshot
+        """
+        return self._match_versions.get(match_id)
+
+    def sport_of(self, match_id):
+        """
+        Sport of a match seen in the snapshot or in a cached listing, or None
+        """
+        for sport, feed in self.snapshot.sports.items():
+            if match_id in feed.matches:
+                return sport
+        event = self.listings.get_event(match_id) or self.cache.get_event(match_id)
+        return event.sport if event is not None else None
+
+    def get_pricing(self, match_id):
+        """
+        Cross-bookmaker pricing of a match from the current snapshot, or from the
+        cache's event index if its sport is not polled yet; None if unknown
+        """
+        for feed in self.snapshot.sports.values():
+            pricing = feed.pricing.get(match_id)
+            if pricing is not None:
+                return pricing
+        event = self.cache.get_event(match_id)
+        return price_event(event) if event is not None else None
+
+    def get_formatted_prices(self, match_id, odds_type):
+        """
+        Display strings of a match's consensus and best prices in an odds type; the
+        whole feed of its sport is converted once per version and odds type.
+        None if the match is not in the snapshot
+        """
+        for sport, feed in self.snapshot.sports.items():
+            if match_id not in feed.pricing:
+                continue
+            cached = self._formatted.get((sport, odds_type))
+            if cached is None or cached[0] != feed.version:
+                cached = (feed.version, format_feed_prices(feed.pricing, odds_type))
+                self._formatted[(sport, odds_type)] = cached
+            return cached[1][match_id]
+        return None
+
+    async def get_commence_index(self):
+        """
+        CommenceIndex over every sport of the current snapshot, built once per version;
+        before the first poll, over the default sport's cached listing
+        """
+        if not self.snapshot.sports:
+            return CommenceIndex(await self.listings.get_odds(DEFAULT_SPORT))
+        if self._index is None or self._index[0] != self.snapshot.version:
+            events = [event for feed in self.snapshot.sports.values() for event in feed.events]
+            self._index = (self.snapshot.version, CommenceIndex(events))
+        return self._index[1]
+
+    def _board_runs(self, sports, start):
+        """
+        Per-sport runs of events starting at or after start, each sorted by start time
+        """
+        runs = {}
+        for sport in sports:
+            events = self.get_events(sport)
+            if events is None:
+                # Not polled yet: use a cached listing if there is one, never fetch
+                events = tuple(sorted(self.listings.peek(sport) or (), key=start_time))
+            runs[sport] = events[bisect.bisect_left(events, start, key=start_time):]
+        return runs
+
+    def board(self, sports=None, limit=8, now=None):
+        """
+        Games of the given sports (all by default) merged by start time, from those
+        in play onwards, plus every league that has any; served from cache only
+        """
+        now = now or time.time()
+        runs = self._board_runs(self.sports, now - ODDS_IN_PLAY_WINDOW)
+        leagues = [sport for sport, run in runs.items() if run and run[0].commence_ts is not None]
+        
+        # k-way merge of the already sorted runs, stopping after limit games
+        merged = heapq.merge(*(runs[sport] for sport in (sports or leagues) if sport in runs), key=start_time)
+        matches = [
+            event.to_match("live" if event.commence_ts <= now else "upcoming")
+            for event in islice((event for event in merged if event.commence_ts is not None), limit)
+        ]
+        return matches, leagues
+
+    async def get_live_matches(self, sport="americanfootball_nfl"):
+        """
+        Live matches of a sport, read from the current snapshot
+        """
+        events = self.get_events(sport)
+        if events is None:
+            return await self.listings.get_live_matches(sport)
+        return live_matches(events)
+
+    async def get_upcoming_matches(self, sport="americanfootball_nfl", days=7):
+        """
+        Upcoming matches of a sport for the next N days, read from the current snapshot
+        """
+        events = self.get_events(sport)
+        if events is None:
+            return await self.listings.get_upcoming_matches(sport, days)
+        return upcoming_matches(events, days)
+
+
+# Initialize odds poller
+odds_poller = OddsPoller(odds_cache, listings=listing_cache)
@@ -0,0 +1,143 @@
+import logging
+from array import array
+from collections import namedtuple, Counter
+from statistics import median
+from config import DEFAULT_ODDS_TYPE
+from odds_format import decimal_to_american, to_decimal_array, format_prices
+
+logger = logging.getLogger(__name__)
+
+# Cross-bookmaker view of one outcome; prices are American odds
+OutcomePrice = namedtuple("OutcomePrice", [
+    "outcome", "point", "best_price", "best_bookmaker", "consensus_price",
+    "implied_probability", "fair_probability"
+])
+
+# Every outcome of one market plus the bookmakers' combined margin
+MarketPricing = namedtuple("MarketPricing", ["market", "outcomes", "overround"])
+
+
+def price_market(matrix):
+    """
+    Best price, median consensus and implied/no-vig probabilities for every outcome of a MarketMatrix
+    
+    Works column by column over the matrix. For spreads and totals only the
+    bookmakers quoting the most common line of an outcome are compared.
+    """
+    width = len(matrix.outcomes)
+    rows = []
+    for o, name in enumerate(matrix.outcomes):
+        decimals = to_decimal_array(matrix.column(o))
+        offered = [b for b, decimal in enumerate(decimals) if decimal == decimal]
+        
+        point = None
+        if matrix.points is not None:
+            points = matrix.points[o::width]
+            quoted = [points[b] for b in offered if points[b] == points[b]]
+            if quoted:
+                point = Counter(quoted).most_common(1)[0][0]
+                offered = [b for b in offered if points[b] == point]
+        if not offered:
+            continue
+        
+        decimals = [decimals[b] for b in offered]
+        best = max(range(len(decimals)), key=decimals.__getitem__)
+        consensus = median(decimals)
+        rows.append((name, point, decimals[best], matrix.bookmakers[offered[best]], consensus, 1 / consensus))
+    
+    total = sum(row[5] for row in rows)
+    outcomes = tuple(
+        OutcomePrice(
+            name, point, decimal_to_american(best), bookmaker, decimal_to_american(consensus),
+            implied, implied / total
+        )
+        for name, point, best, bookmaker, consensus, implied in rows
+    )
+    return MarketPricing(matrix.key, outcomes, total - 1 if rows else 0)
+
+
+def price_event(event):
+    """
+    Pricing of every market of an EventOdds
+    """
+    return {key: price_market(matrix) for key, matrix in event.markets.items()}
+
+
+def price_feed(events, previous=None, changed=None):
+    """
+    Pricing of every event of a feed, reusing previous results for matches outside changed
+    """
+    pricing = {}
+    for event in events:
+        if previous is not None and changed is not None and event.match_id not in changed \
+                and event.match_id in previous:
+            pricing[event.match_id] = previous[event.match_id]
+        else:
+            pricing[event.match_id] = price_event(event)
+    return pricing
+
+
+def format_feed_prices(pricing_by_match, odds_type=DEFAULT_ODDS_TYPE):
+    """
+    Display strings of the consensus and best price of every outcome of a feed,
+    converted in one bulk pass: match_id -> market -> ((consensus, best), ...)
+    """
+    prices = array("d")
+    for pricing in pricing_by_match.values():
+        for market_pricing in pricing.values():
+            for price in market_pricing.outcomes:
+                prices.append(price.consensus_price)
+                prices.append(price.best_price)
+    
+    formatted = iter(format_prices(prices, odds_type))
+    return {
+        match_id: {
+            market: tuple((next(formatted), next(formatted)) for _ in market_pricing.outcomes)
+            for market, market_pricing in pricing.items()
+        }
+        for match_id, pricing in pricing_by_match.items()
+    }
+
+
+def consensus_price(pricing, outcome, market="h2h"):
+    """
+    Consensus price of one outcome, or None if it is not priced
+    """
+    market_pricing = (pricing or {}).get(market)
+    if market_pricing is None:
+        return None
+    for outcome_price in market_pricing.outcomes:
+        if outcome_price.outcome == outcome:
+            return outcome_price.consensus_price
+    return None
+
+
+def format_pricing_display(pricing, odds_type=DEFAULT_ODDS_TYPE, formatted=None):
+    """
+    Format consensus line, best price and fair probability of each market for Telegram,
+    using the match's entry of format_feed_prices when given
+    """
+    sections = (
+        ("h2h", "📊 <b>Moneyline</b>"),
+        ("spreads", "📈 <b>Spreads</b>"),
+        ("totals", "🎯 <b>Totals</b>"),
+    )
+    if formatted is None:
+        formatted = format_feed_prices({None: pricing}, odds_type)[None]
+    display = ""
+    for market, title in sections:
+        market_pricing = pricing.get(market)
+        if market_pricing is None or not market_pricing.outcomes:
+            continue
+        display += f"\n{title} (line · best · fair):"
+        for price, (consensus, best) in zip(market_pricing.outcomes, formatted[market]):
+            label = price.outcome
+            if price.point is not None:
+                label += f" {price.point:+.1f}" if market == "spreads" else f" {price.point:g}"
+            display += (
+                f"\n  • {label}: <b>{consensus}</b>"
+                f" · {best} @ {price.best_bookmaker}"
+                f" · {price.fair_probability * 100:.1f}%"
+            )
+        display += "\n"
+    return display
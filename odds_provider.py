@@ -0,0 +1,138 @@
+import os
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from odds_decode import loads
+
+logger = logging.getLogger(__name__)
+
+
+def shift_commence_times(events, now=None):
+    """
+    Move every commence time so the earliest game started an hour ago
+    """
+    times = [datetime.fromisoformat(event["commence_time"].replace("Z", "+00:00")) for event in events]
+    if not times:
+        return events
+    offset = (now or datetime.now(timezone.utc)) - timedelta(hours=1) - min(times)
+    for event, commence in zip(events, times):
+        event["commence_time"] = (commence + offset).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return events
+
+
+class OddsProvider:
+    """
+    Source of odds data in The Odds API's JSON shape.
+    
+    The caches, poller and handlers only use this interface, so any source
+    that can list sports and events and return odds and scores can feed the
+    bot. The fetch_* methods return the decoded payload (a list, or an
+    iterator decoded as it is consumed) and leave errors to the caller.
+    """
+    name = "odds provider"
+
+    async def fetch_sports(self):
+        """
+        Raw /sports list
+        """
+        raise NotImplementedError
+
+    async def fetch_events(self, sport):
+        """
+        Odds-free events of a sport
+        """
+        raise NotImplementedError
+
+    async def fetch_odds(self, sport, markets="h2h,spreads,totals", regions="us", event_ids=None, limit=None):
+        """
+        Events of a sport with bookmaker odds, optionally only the given event ids (comma separated)
+        """
+        raise NotImplementedError
+
+    async def fetch_scores(self, sport, days_from=None):
+        """
+        Scores of a sport's live and (with days_from) recently completed games
+        """
+        raise NotImplementedError
+
+    @property
+    def is_available(self):
+        """
+        False while the provider is known to be down and cached odds should be served
+        """
+        return True
+
+    def health(self):
+        """
+        One line on why the provider is unavailable, for the admin panel; None when healthy
+        """
+        return None
+
+    async def close(self):
+        """
+        Release the provider's connections
+        """
+
+
+class FileOddsProvider(OddsProvider):
+    """
+    Recorded Odds API responses read from a directory, for running the whole
+    bot offline (performance regression tests, demos). Same layout as the
+    stub server's fixtures:
+        
+        <directory>/sports.json
+        <directory>/<sport>/odds.json, events.json, scores.json
+    
+    Sports without a recording have no events. Each file is read once; with
+    shift_times, recorded games are moved once so they look current.
+    """
+    name = "recorded odds"
+
+    def __init__(self, directory, shift_times=False):
+        self.directory = directory
+        self.shift_times = shift_times
+        self._payloads = {}  # relative path -> decoded payload
+
+    def _read(self, *parts):
+        path = os.path.join(self.directory, *parts)
+        if not os.path.exists(path):
+            return []
+        with open(path, "rb") as f:
+            data = loads(f.read())
+        if self.shift_times and parts[-1] in ("odds.json", "events.json"):
+            data = shift_commence_times(data)
+        return data
+
+    async def _load(self, *parts):
+        if parts not in self._payloads:
+            self._payloads[parts] = await asyncio.to_thread(self._read, *parts)
+        return self._payloads[parts]
+
+    async def fetch_sports(self):
+        return await self._load("sports.json")
+
+    async def fetch_events(self, sport):
+        return iter(await self._load(sport, "events.json"))
+
+    async def fetch_odds(self, sport, markets="h2h,spreads,totals", regions="us", event_ids=None, limit=None):
+        data = await self._load(sport, "odds.json")
+        wanted_markets = set(markets.split(","))
+        wanted_ids = set(event_ids.split(",")) if event_ids else None
+        
+        # Recordings hold every market; drop the ones that were not asked for
+        events = []
+        for event in data:
+            if wanted_ids is not None and event["id"] not in wanted_ids:
+                continue
+            event = dict(event)
+            event["bookmakers"] = [
+                dict(bookmaker, markets=[m for m in bookmaker["markets"] if m["key"] in wanted_markets])
+                for bookmaker in event.get("bookmakers", ())
+            ]
+            events.append(event)
+            if limit is not None and len(events) >= limit:
+                break
+        return events
+
+    async def fetch_scores(self, sport, days_from=None):
+        return iter(await self._load(sport, "scores.json"))
@@ -0,0 +1,49 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class RenderCache:
+    """
+    Finished match screens (text and keyboard) keyed by (match_id, version, odds format).
+    
+    A match's version is the snapshot version in which its odds last changed,
+    so a screen is rendered once per odds change and format, however many
+    users open it. The snapshot listener drops the screens of changed matches.
+    """
+
+    def __init__(self):
+        self._screens = {}  # match_id -> {(version, odds_type): (text, reply_markup)}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, match_id, version, odds_type):
+        """
+        Cached (text, reply_markup) of a screen, or None
+        """
+        if version is None:
+            return None
+        rendered = self._screens.get(match_id, {}).get((version, odds_type))
+        if rendered is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return rendered
+
+    def put(self, match_id, version, odds_type, rendered):
+        """
+        Remember a rendered screen; screens without a snapshot version are not cached
+        """
+        if version is not None:
+            self._screens.setdefault(match_id, {})[(version, odds_type)] = rendered
+
+    def invalidate(self, old_snapshot, new_snapshot, changes):
+        """
+        Snapshot listener: forget the screens of every match the change set touched
+        """
+        for match_id in changes.changed_matches:
+            self._screens.pop(match_id, None)
+
+
+# Initialize render cache
+render_cache = RenderCache()
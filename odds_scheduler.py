@@ -0,0 +1,126 @@
+import time
+import heapq
+import bisect
+import logging
+from config import (
+    SPORTS_LIST, ODDS_IN_PLAY_WINDOW, ODDS_POLL_TIERS, ODDS_POLL_IDLE_INTERVAL, ODDS_GAMES_SOON_WINDOW
+)
+from odds_budget import request_budget
+
+logger = logging.getLogger(__name__)
+
+
+class PollScheduler:
+    """
+    Priority queue of sports ordered by when each is due to be polled again.
+    
+    A sport's interval comes from its most urgent event: in-play and
+    starting-soon games are polled often, distant ones rarely (ODDS_POLL_TIERS).
+    Commence times of each sport's latest feed are kept sorted, and the whole
+    schedule is stretched by the request budget's throttle factor.
+    """
+
+    def __init__(self, sports=SPORTS_LIST, tiers=ODDS_POLL_TIERS, idle_interval=ODDS_POLL_IDLE_INTERVAL,
+                 budget=request_budget):
+        self.sports = list(sports)
+        self.tiers = sorted(tiers)
+        self.idle_interval = idle_interval
+        self.budget = budget
+        self._heap = []  # (due, sport); entries superseded in _due are skipped
+        self._due = {}  # sport -> time.monotonic() it is due
+        self._commence = {}  # sport -> sorted tuple of commence timestamps
+        
+        # Nothing is known yet: poll everything straight away
+        for sport in self.sports:
+            self._push(sport, 0)
+
+    def _push(self, sport, due):
+        self._due[sport] = due
+        heapq.heappush(self._heap, (due, sport))
+
+    def update_events(self, sport, events):
+        """
+        Remember the sorted commence times of a sport's latest feed
+        """
+        self._commence[sport] = tuple(sorted(
+            event.commence_ts for event in events or () if event.commence_ts is not None
+        ))
+
+    def seconds_until_next_game(self, sport, now=None):
+        """
+        Seconds until the sport's next unfinished game starts (<= 0 if in play), or None
+        """
+        now = now or time.time()
+        times = self._commence.get(sport, ())
+        i = bisect.bisect_left(times, now - ODDS_IN_PLAY_WINDOW)
+        if i == len(times):
+            return None
+        return times[i] - now
+
+    def has_games_soon(self, sport, now=None):
+        until = self.seconds_until_next_game(sport, now)
+        return until is not None and until <= ODDS_GAMES_SOON_WINDOW
+
+    def base_interval(self, sport, now=None):
+        """
+        Unthrottled poll interval of a sport from its most urgent event
+        """
+        until = self.seconds_until_next_game(sport, now)
+        if until is None:
+            return self.idle_interval * self.budget.slowdown(False)
+        
+        faster_horizon = None
+        for horizon, interval in self.tiers:
+            if until <= horizon:
+                break
+            faster_horizon = horizon
+        else:
+            interval = self.idle_interval
+        
+        # Wake up in time for the game to move into the next faster tier
+        if faster_horizon is not None:
+            interval = min(interval, max(until - faster_horizon, self.tiers[0][1]))
+        return interval * self.budget.slowdown(until <= ODDS_GAMES_SOON_WINDOW)
+
+    def intervals(self, now=None):
+        """
+        Unthrottled interval of every sport
+        """
+        now = now or time.time()
+        return {sport: self.base_interval(sport, now) for sport in self.sports}
+
+    def reschedule(self, sport):
+        """
+        Queue a sport's next poll after it has just been polled (or failed)
+        """
+        intervals = self.intervals()
+        interval = intervals[sport] * self.budget.throttle(list(intervals.values()))
+        self._push(sport, time.monotonic() + interval)
+        logger.debug(f"Next poll of {sport} in {interval:.0f}s")
+
+    def pop_due(self, now=None):
+        """
+        Remove and return every sport that is due now
+        """
+        now = now or time.monotonic()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            when, sport = heapq.heappop(self._heap)
+            if self._due.get(sport) == when and sport not in due:
+                due.append(sport)
+        return due
+
+    def next_wake(self):
+        """
+        time.monotonic() at which the earliest sport becomes due
+        """
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else time.monotonic() + self.idle_interval
+
+    def next_poll_times(self):
+        """
+        Seconds until each sport is polled again (0 if it is due now)
+        """
+        now = time.monotonic()
+        return {sport: max(self._due.get(sport, 0) - now, 0) for sport in self.sports}
@@ -0,0 +1,199 @@
+import os
+import sys
+import json
+import time
+import struct
+import logging
+import tempfile
+from array import array
+from config import ODDS_SNAPSHOT_ENABLED, ODDS_SNAPSHOT_DIR
+from background_writer import BackgroundWriter
+from odds_decode import loads
+from odds_matrix import EventOdds, MarketMatrix
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_SUFFIX = ".snap"
+
+# File layout: MAGIC, format version (1 byte), JSON header length (uint32 LE), JSON header, float64 data
+SNAPSHOT_MAGIC = b"ODDSNAP"
+SNAPSHOT_VERSION = 1
+_PREFIX = struct.Struct("<7sBI")
+
+
+def encode_feed(events):
+    """
+    JSON-able description of a feed plus the raw bytes of every price and point matrix
+    """
+    described, blobs = [], []
+    for event in events:
+        markets = []
+        for key, matrix in event.markets.items():
+            markets.append([key, list(matrix.bookmakers), list(matrix.outcomes), matrix.points is not None])
+            blobs.append(matrix.prices.tobytes())
+            if matrix.points is not None:
+                blobs.append(matrix.points.tobytes())
+        described.append([
+            event.match_id, event.sport, event.home_team, event.away_team, event.commence_time, markets
+        ])
+    return described, b"".join(blobs)
+
+
+def decode_feed(described, data, swap):
+    """
+    Rebuild a tuple of EventOdds from encode_feed output
+    """
+    view = memoryview(data)
+    offset = 0
+
+    def take(count):
+        nonlocal offset
+        values = array("d")
+        values.frombytes(view[offset:offset + count * values.itemsize])
+        if swap:
+            values.byteswap()
+        offset += count * values.itemsize
+        return values
+    
+    events = []
+    for match_id, sport, home_team, away_team, commence_time, markets in described:
+        matrices = {}
+        for key, bookmakers, outcomes, has_points in markets:
+            size = len(bookmakers) * len(outcomes)
+            prices = take(size)
+            points = take(size) if has_points else None
+            matrices[sys.intern(key)] = MarketMatrix(
+                key, tuple(map(sys.intern, bookmakers)), tuple(map(sys.intern, outcomes)), prices, points
+            )
+        events.append(EventOdds(match_id, sport, home_team, away_team, commence_time, matrices))
+    if offset != len(data):
+        raise ValueError(f"{len(data) - offset} unread bytes after the last matrix")
+    return tuple(events)
+
+
+class SnapshotStore:
+    """
+    Latest odds feeds and sports list on disk, so a restarted bot has odds
+    to serve before its first request to the Odds API.
+    
+    Each snapshot is its own file: a magic and format version, a JSON header
+    (save time, event metadata, matrix shapes) and the raw float64 bytes of
+    the price matrices. Nothing in a file is executed when it is loaded, and
+    files of another format version are skipped, so a layout change costs a
+    cold start rather than a crash. Files are written to a temporary file in
+    the same directory and moved over the old one on a background thread, so
+    a crash mid-write never leaves a torn snapshot.
+    """
+
+    def __init__(self, directory=ODDS_SNAPSHOT_DIR, enabled=ODDS_SNAPSHOT_ENABLED):
+        self.directory = directory
+        self.enabled = enabled
+        self._writer = BackgroundWriter("odds-store", "odds snapshot")
+
+    def _path(self, name):
+        return os.path.join(self.directory, name + SNAPSHOT_SUFFIX)
+
+    def save_feed(self, name, events, saved_at=None):
+        """
+        Save a feed of EventOdds under name
+        """
+        if self.enabled:
+            described, data = encode_feed(events)
+            self._writer.submit(self.write, name, "feed", described, data, saved_at or time.time())
+
+    def save_json(self, name, payload, saved_at=None):
+        """
+        Save a JSON-able payload under name
+        """
+        if self.enabled:
+            self._writer.submit(self.write, name, "json", payload, b"", saved_at or time.time())
+
+    def write(self, name, kind, payload, data, saved_at):
+        """
+        Atomically replace the snapshot called name
+        """
+        header = json.dumps({
+            "saved_at": saved_at, "kind": kind, "byteorder": sys.byteorder, "payload": payload
+        }, separators=(",", ":")).encode()
+        
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_PREFIX.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(header)))
+                f.write(header)
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._path(name))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _read(self, name, kind):
+        """
+        (saved_at, header payload, float64 data) of a snapshot, or None if it is
+        missing, of another format version or unreadable
+        """
+        if not self.enabled:
+            return None
+        try:
+            with open(self._path(name), "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return None
+        
+        try:
+            magic, version, header_length = _PREFIX.unpack_from(raw)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                logger.info(f"Skipping odds snapshot {name}: not a version {SNAPSHOT_VERSION} snapshot")
+                return None
+            header = loads(raw[_PREFIX.size:_PREFIX.size + header_length])
+            if header["kind"] != kind:
+                raise ValueError(f"expected a {kind} snapshot, found {header['kind']}")
+            return header["saved_at"], header, raw[_PREFIX.size + header_length:]
+        except (struct.error, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable odds snapshot {name}: {e!r}")
+            return None
+
+    def load_feed(self, name):
+        """
+        (saved_at, tuple of EventOdds) of a feed snapshot, or None
+        """
+        snapshot = self._read(name, "feed")
+        if snapshot is None:
+            return None
+        saved_at, header, data = snapshot
+        try:
+            return saved_at, decode_feed(header["payload"], data, header["byteorder"] != sys.byteorder)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable odds snapshot {name}: {e!r}")
+            return None
+
+    def load_json(self, name):
+        """
+        (saved_at, payload) of a JSON snapshot, or None
+        """
+        snapshot = self._read(name, "json")
+        return (snapshot[0], snapshot[1]["payload"]) if snapshot is not None else None
+
+    def names(self, prefix=""):
+        """
+        Names of the stored snapshots starting with prefix
+        """
+        if not self.enabled or not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            entry[:-len(SNAPSHOT_SUFFIX)] for entry in os.listdir(self.directory)
+            if entry.startswith(prefix) and entry.endswith(SNAPSHOT_SUFFIX)
+        )
+
+    async def close(self):
+        """
+        Wait for queued snapshots to be written and stop the store thread
+        """
+        await self._writer.close()
+
+
+# Initialize snapshot store
+snapshot_store = SnapshotStore()
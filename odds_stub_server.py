@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for The Odds API, for load tests and offline benchmarks.
+
+Replays recorded responses from a fixtures directory:
+    
+    fixtures/odds_api/sports.json
+    fixtures/odds_api/<sport>/odds.json
+    fixtures/odds_api/<sport>/events.json
+    fixtures/odds_api/<sport>/scores.json
+
+Sports without fixtures are served synthetic events. Latency, injected
+errors and the x-requests-* quota headers are configurable, and commence
+times can be shifted so recorded games look current.
+    
+    python odds_stub_server.py --port 8099 --latency 0.05 --error-rate 0.02
+    ODDS_API_BASE_URL=http://127.0.0.1:8099/v4 python run_bot.py
+
+Record real responses once with --record (spends ODDS_API_KEY quota).
+"""
+import os
+import json
+import random
+import asyncio
+import logging
+import argparse
+from datetime import datetime, timedelta, timezone
+import requests
+from aiohttp import web
+from config import ODDS_API_KEY, SPORTS_LIST, POPULAR_SPORTSBOOKS
+from odds_provider import shift_commence_times
+
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "odds_api")
+UPSTREAM_URL = "https://api.the-odds-api.com/v4"
+FIXTURE_KINDS = ("odds", "events", "scores")
+
+
+def format_time(value):
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def synthetic_events(sport, count, seed=0, now=None):
+    """
+    Odds API shaped events with h2h, spreads and totals from every popular sportsbook
+    """
+    rng = random.Random(f"{sport}-{seed}")
+    now = now or datetime.now(timezone.utc).replace(microsecond=0)
+    events = []
+    for i in range(count):
+        home, away = f"{sport.split('_')[-1].upper()} Home {i + 1}", f"{sport.split('_')[-1].upper()} Away {i + 1}"
+        # A few games in play, the rest spread over the coming week
+        commence = now + timedelta(hours=rng.uniform(-2, 0) if i < count // 4 else rng.uniform(1, 168))
+        spread = rng.choice((1.5, 2.5, 3.5, 6.5, 7.5))
+        total = rng.choice((41.5, 44.5, 47.5, 210.5, 224.5))
+        favourite = rng.choice((-105, -120, -150, -200))
+        bookmakers = []
+        for book in POPULAR_SPORTSBOOKS:
+            shade = rng.choice((-10, -5, 0, 0, 5))
+            bookmakers.append({
+                "key": book.lower().replace(" ", ""),
+                "title": book,
+                "last_update": format_time(now),
+                "markets": [
+                    {"key": "h2h", "outcomes": [
+                        {"name": home, "price": favourite + shade},
+                        {"name": away, "price": -favourite - 20 + shade}
+                    ]},
+                    {"key": "spreads", "outcomes": [
+                        {"name": home, "price": -110 + shade, "point": -spread},
+                        {"name": away, "price": -110 - shade, "point": spread}
+                    ]},
+                    {"key": "totals", "outcomes": [
+                        {"name": "Over", "price": -110 + shade, "point": total},
+                        {"name": "Under", "price": -110 - shade, "point": total}
+                    ]}
+                ]
+            })
+        events.append({
+            "id": f"{sport}-{seed}-{i}",
+            "sport_key": sport,
+            "sport_title": sport,
+            "commence_time": format_time(commence),
+            "home_team": home,
+            "away_team": away,
+            "bookmakers": bookmakers
+        })
+    return events
+
+
+def synthetic_scores(events):
+    """
+    /scores entries for a list of events: started games have a running score
+    """
+    now = datetime.now(timezone.utc)
+    scores = []
+    for event in events:
+        started = datetime.fromisoformat(event["commence_time"].replace("Z", "+00:00")) <= now
+        scores.append({
+            "id": event["id"],
+            "sport_key": event["sport_key"],
+            "sport_title": event.get("sport_title", event["sport_key"]),
+            "commence_time": event["commence_time"],
+            "completed": False,
+            "home_team": event["home_team"],
+            "away_team": event["away_team"],
+            "scores": [
+                {"name": event["home_team"], "score": "0"},
+                {"name": event["away_team"], "score": "0"}
+            ] if started else None,
+            "last_update": format_time(now) if started else None
+        })
+    return scores
+
+
+class OddsStubServer:
+    """
+    aiohttp application replaying fixtures with Odds API quota accounting
+    """
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR, latency=0.0, jitter=0.0, error_rate=0.0,
+                 error_statuses=(500, 502, 503, 429), timeout_rate=0.0, timeout_delay=30.0,
+                 quota=500, synthetic_count=12, shift_times=False, seed=0):
+        self.fixtures_dir = fixtures_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.timeout_rate = timeout_rate
+        self.timeout_delay = timeout_delay
+        self.remaining = quota
+        self.used = 0
+        self.synthetic_count = synthetic_count
+        self.shift_times = shift_times
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self._fixtures = {}  # (sport, kind) -> decoded fixture
+        self._bodies = {}  # cache key -> serialized response body
+        self.requests_served = 0
+
+    def _load(self, path):
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def fixture(self, sport, kind):
+        """
+        Recorded payload of a sport (or a synthetic one), loaded once
+        """
+        key = (sport, kind)
+        if key not in self._fixtures:
+            data = self._load(os.path.join(self.fixtures_dir, sport, f"{kind}.json"))
+            if data is None:
+                odds = self.fixture(sport, "odds") if kind != "odds" else synthetic_events(
+                    sport, self.synthetic_count, self.seed
+                )
+                if kind == "events":
+                    data = [{k: v for k, v in event.items() if k != "bookmakers"} for event in odds]
+                elif kind == "scores":
+                    data = synthetic_scores(odds)
+                else:
+                    data = odds
+            elif self.shift_times and kind != "scores":
+                data = shift_commence_times(data)
+            self._fixtures[key] = data
+        return self._fixtures[key]
+
+    def sports(self):
+        data = self._load(os.path.join(self.fixtures_dir, "sports.json"))
+        if data is None:
+            data = [
+                {"key": sport, "group": sport.split("_")[0].title(), "title": sport,
+                 "description": sport, "active": True, "has_outrights": False}
+                for sport in SPORTS_LIST
+            ]
+        for sport in data:
+            sport.setdefault("inactive", not sport.get("active", True))
+        return data
+
+    def _body(self, key, build):
+        if key not in self._bodies:
+            self._bodies[key] = json.dumps(build(), separators=(",", ":")).encode()
+        return self._bodies[key]
+
+    def _headers(self, cost):
+        return {
+            "x-requests-remaining": str(self.remaining),
+            "x-requests-used": str(self.used),
+            "x-requests-last": str(cost),
+        }
+
+    async def _respond(self, request, cost, body):
+        """
+        Apply latency, error injection and quota accounting around one response
+        """
+        self.requests_served += 1
+        delay = max(self.rng.gauss(self.latency, self.jitter), 0) if self.latency or self.jitter else 0
+        if self.timeout_rate and self.rng.random() < self.timeout_rate:
+            delay = self.timeout_delay
+        if delay:
+            await asyncio.sleep(delay)
+        
+        if self.error_rate and self.rng.random() < self.error_rate:
+            status = self.rng.choice(self.error_statuses)
+            return web.json_response({"message": "Injected error"}, status=status, headers=self._headers(0))
+        
+        if cost > self.remaining:
+            return web.json_response(
+                {"message": "Usage quota has been reached", "error_code": "OUT_OF_USAGE_CREDITS"},
+                status=401, headers=self._headers(0)
+            )
+        self.remaining -= cost
+        self.used += cost
+        return web.Response(body=body, content_type="application/json", headers=self._headers(cost))
+
+    async def handle_sports(self, request):
+        return await self._respond(request, 0, self._body(("sports",), self.sports))
+
+    async def handle_odds(self, request):
+        sport = request.match_info["sport"]
+        markets = tuple(request.query.get("markets", "h2h").split(","))
+        regions = request.query.get("regions", "us").split(",")
+        event_ids = request.query.get("eventIds")
+        wanted = set(event_ids.split(",")) if event_ids else None
+
+        def build():
+            events = []
+            for event in self.fixture(sport, "odds"):
+                if wanted is not None and event["id"] not in wanted:
+                    continue
+                event = dict(event)
+                event["bookmakers"] = [
+                    dict(bookmaker, markets=[m for m in bookmaker["markets"] if m["key"] in markets])
+                    for bookmaker in event.get("bookmakers", ())
+                ]
+                events.append(event)
+            return events
+        
+        # Same cost model as the real API: markets x regions
+        cost = len(markets) * len(regions)
+        return await self._respond(request, cost, self._body(("odds", sport, markets, event_ids), build))
+
+    async def handle_events(self, request):
+        sport = request.match_info["sport"]
+        return await self._respond(request, 0, self._body(("events", sport), lambda: self.fixture(sport, "events")))
+
+    async def handle_scores(self, request):
+        sport = request.match_info["sport"]
+        cost = 2 if request.query.get("daysFrom") else 1
+        return await self._respond(request, cost, self._body(("scores", sport), lambda: self.fixture(sport, "scores")))
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get("/v4/sports", self.handle_sports)
+        app.router.add_get("/v4/sports/", self.handle_sports)
+        app.router.add_get("/v4/sports/{sport}/odds", self.handle_odds)
+        app.router.add_get("/v4/sports/{sport}/odds/", self.handle_odds)
+        app.router.add_get("/v4/sports/{sport}/events", self.handle_events)
+        app.router.add_get("/v4/sports/{sport}/scores", self.handle_scores)
+        return app
+
+
+def record(fixtures_dir=FIXTURES_DIR, sports=SPORTS_LIST, upstream=UPSTREAM_URL, api_key=ODDS_API_KEY):
+    """
+    Save real Odds API responses as fixtures (spends quota once per sport)
+    """
+    os.makedirs(fixtures_dir, exist_ok=True)
+    params = {
+        "odds": {"apiKey": api_key, "regions": "us", "markets": "h2h,spreads,totals", "oddsFormat": "american"},
+        "events": {"apiKey": api_key},
+        "scores": {"apiKey": api_key},
+    }
+    
+    response = requests.get(f"{upstream}/sports", params={"apiKey": api_key}, timeout=30)
+    response.raise_for_status()
+    with open(os.path.join(fixtures_dir, "sports.json"), "w", encoding="utf-8") as f:
+        json.dump(response.json(), f)
+    
+    for sport in sports:
+        os.makedirs(os.path.join(fixtures_dir, sport), exist_ok=True)
+        for kind in FIXTURE_KINDS:
+            response = requests.get(f"{upstream}/sports/{sport}/{kind}", params=params[kind], timeout=30)
+            if response.status_code != 200:
+                logger.warning(f"⚠️ Skipping {sport}/{kind}: HTTP {response.status_code}")
+                continue
+            with open(os.path.join(fixtures_dir, sport, f"{kind}.json"), "w", encoding="utf-8") as f:
+                json.dump(response.json(), f)
+            logger.info(f"✅ Recorded {sport}/{kind} ({response.headers.get('x-requests-remaining')} requests left)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for The Odds API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="directory of recorded responses")
+    parser.add_argument("--latency", type=float, default=0.0, help="mean response delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="standard deviation of the delay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with an error")
+    parser.add_argument("--error-statuses", default="500,502,503,429", help="HTTP statuses to inject")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="fraction of requests delayed by --timeout-delay")
+    parser.add_argument("--timeout-delay", type=float, default=30.0)
+    parser.add_argument("--quota", type=int, default=500, help="requests available before 401 OUT_OF_USAGE_CREDITS")
+    parser.add_argument("--synthetic-events", type=int, default=12, help="events per sport without fixtures")
+    parser.add_argument("--shift-times", action="store_true", help="move recorded games so they look current")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--record", action="store_true", help="record real responses into --fixtures and exit")
+    args = parser.parse_args()
+    
+    if args.record:
+        record(args.fixtures)
+        return
+    
+    server = OddsStubServer(
+        fixtures_dir=args.fixtures,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_statuses=[int(status) for status in args.error_statuses.split(",") if status],
+        timeout_rate=args.timeout_rate,
+        timeout_delay=args.timeout_delay,
+        quota=args.quota,
+        synthetic_count=args.synthetic_events,
+        shift_times=args.shift_times,
+        seed=args.seed
+    )
+    logger.info(f"🧪 Odds API stand-in on http://{args.host}:{args.port}/v4 (fixtures: {args.fixtures})")
+    web.run_app(server.app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,7 @@ def check_dependencies():
     required_packages = [
         'telegram',
         'requests',
+        'aiohttp',
         'dotenv',
         'openai',
         'gtts',
@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+# config.py reads these at import time
+os.environ.setdefault("ADMIN_ID", "0")
+os.environ["SQLITE_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="betting-bot-tests-"), "betting_bot.db")
+os.environ["ODDS_SNAPSHOT_ENABLED"] = "False"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,81 @@
+import re
+import pytest
+import database
+from database import ConnectionPool, Database
+
+HOT_TABLES = re.compile(r"\b(bets|transactions|deposits|withdrawals)\b")
+
+
+@pytest.fixture
+def traced_db(tmp_path, monkeypatch):
+    """
+    A fresh Database whose pooled connections record every statement they run
+    """
+    statements = []
+    connect = ConnectionPool._connect
+
+    def traced_connect(self):
+        conn = connect(self)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(ConnectionPool, "_connect", traced_connect)
+    monkeypatch.setattr(database, "SQLITE_DB_PATH", str(tmp_path / "plans.db"))
+    db = Database()  # init_db() applies every schema step
+    statements.clear()
+    yield db, statements
+    db.pool.close()
+
+
+def query_plans(db, statements):
+    """
+    EXPLAIN QUERY PLAN details of every recorded SELECT on a hot table
+    """
+    selects = [sql for sql in statements if sql.lstrip().upper().startswith("SELECT") and HOT_TABLES.search(sql)]
+    assert selects, "no query on a hot table was recorded"
+    with db.pool.read() as conn:
+        return {sql: [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")] for sql in selects}
+
+
+def assert_indexed(db, statements):
+    for sql, plan in query_plans(db, statements).items():
+        for step in plan:
+            assert step.startswith("SEARCH"), f"{step!r} in plan of {sql}"
+            assert re.search(r"USING (COVERING )?INDEX|USING INTEGER PRIMARY KEY", step), f"{step!r} in plan of {sql}"
+            assert "TEMP B-TREE" not in step, f"{step!r} in plan of {sql}"
+
+
+def test_migrate_records_schema_version(traced_db):
+    db, _ = traced_db
+    with db.pool.read() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == database.SCHEMA_STEPS[-1][0]
+
+
+def test_user_bets_use_index(traced_db):
+    db, statements = traced_db
+    db.get_user_bets(1)
+    assert_indexed(db, statements)
+
+
+def test_user_bets_by_status_use_index(traced_db):
+    db, statements = traced_db
+    db.get_user_bets(1, status="pending")
+    assert_indexed(db, statements)
+
+
+@pytest.mark.parametrize("method", ["get_pending_transactions", "get_pending_deposits", "get_pending_withdrawals"])
+def test_pending_screens_use_index(traced_db, method):
+    db, statements = traced_db
+    getattr(db, method)()
+    assert_indexed(db, statements)
+
+
+def test_match_settlement_uses_index(traced_db):
+    db, statements = traced_db
+    db.add_user(1, "punter", "A", "B")
+    db.update_balance(1, 100)
+    db.place_bet(1, "match-1", "Home", 150, 10)
+    statements.clear()
+    
+    db.settle_match("match-1", "Home")
+    assert_indexed(db, statements)